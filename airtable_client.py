@@ -0,0 +1,231 @@
+"""
+Airtable REST client for the Hiring System Dashboard
+One pooled keep-alive session per table, a token-bucket limiter matched to
+Airtable's per-base rate limit, and retry with backoff on 429 / 5xx
+"""
+
+import fcntl
+import os
+import random
+import struct
+import threading
+import time
+from contextlib import contextmanager
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import perf
+
+
+AIRTABLE_API_URL = "https://api.airtable.com/v0"
+RATE_LIMIT = 5  # requests per second per base (Airtable's documented limit)
+PAGE_SIZE = 100  # Airtable's maximum page size
+BATCH_SIZE = 10  # Airtable's maximum records per create/update request
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Blocking token bucket: `rate` tokens per second, bursts of up to `capacity`.
+
+    Thread-safe within one process; share one instance between clients that
+    hit the same base (SharedTokenBucket extends that across processes).
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """Hold every caller back, e.g. after Airtable answered 429"""
+        with self._lock:
+            self._tokens = min(self._tokens, 0) - seconds * self.rate
+
+
+class SharedTokenBucket:
+    """TokenBucket whose state lives in a small file, so every process using
+    `path` draws from the same `rate` (e.g. all gunicorn workers).
+
+    Each acquire() holds an exclusive flock on the file while it reads and
+    updates the token count, like RecordStore.refresh_lock().
+    """
+
+    STATE = struct.Struct("dd")  # tokens, updated (Unix time)
+
+    def __init__(self, path, rate, capacity=None):
+        self.path = path
+        self.rate = rate
+        self.capacity = capacity or rate
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def acquire(self):
+        while True:
+            with self._locked_state() as (tokens, update):
+                if tokens >= 1:
+                    update(tokens - 1)
+                    return
+                update(tokens)
+                wait = (1 - tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """Hold every caller in every process back, e.g. after Airtable answered 429"""
+        with self._locked_state() as (tokens, update):
+            update(min(tokens, 0) - seconds * self.rate)
+
+    @contextmanager
+    def _locked_state(self):
+        """Yield (tokens refilled up to now, update) with the file locked"""
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            now = time.time()
+            data = os.pread(fd, self.STATE.size, 0)
+            if len(data) == self.STATE.size:
+                tokens, updated = self.STATE.unpack(data)
+                tokens = min(self.capacity, tokens + max(0, now - updated) * self.rate)
+            else:
+                tokens = self.capacity
+            yield tokens, lambda value: os.pwrite(fd, self.STATE.pack(value, now), 0)
+        finally:
+            os.close(fd)  # also releases the lock
+
+
+class AirtableClient:
+    """Records API for one Airtable table.
+
+    Every request goes through the limiter and is retried on connection
+    errors, timeouts, 429 and 5xx (honouring Retry-After). Other HTTP errors
+    raise requests.HTTPError as before.
+    """
+
+    def __init__(self, base_id, table_id, token, api_url=AIRTABLE_API_URL, limiter=None,
+                 timeout=(5, 30), max_retries=5, backoff=1.0):
+        self.url = f"{api_url.rstrip('/')}/{base_id}/{table_id}"
+        self.limiter = limiter or TokenBucket(RATE_LIMIT)
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+
+        self.session = requests.Session()
+        self.session.headers.update({
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json"
+        })
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=10)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._local = threading.local()
+
+    @contextmanager
+    def tally(self):
+        """Count the requests this thread makes inside the block.
+
+        Yields a dict of requests, retries, pages, bytes and seconds (time
+        spent waiting on Airtable, excluding rate-limit and backoff sleeps).
+        """
+        counts = {"requests": 0, "retries": 0, "pages": 0, "bytes": 0, "seconds": 0.0}
+        outer = getattr(self._local, "tally", None)
+        self._local.tally = counts
+        try:
+            yield counts
+        finally:
+            self._local.tally = outer
+
+    def _count(self, key, value=1):
+        counts = getattr(self._local, "tally", None)
+        if counts is not None:
+            counts[key] += value
+
+    def request(self, method, path="", **kwargs):
+        """Send a request to the table URL and return the decoded JSON body"""
+        kwargs.setdefault("timeout", self.timeout)
+        url = f"{self.url}/{path}" if path else self.url
+        attempt = 0
+        while True:
+            self.limiter.acquire()
+            start = time.perf_counter()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self._record(method, type(e).__name__, time.perf_counter() - start, 0)
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._delay(attempt)
+            else:
+                self._record(method, str(response.status_code), time.perf_counter() - start,
+                             len(response.content))
+                if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                    response.raise_for_status()
+                    return response.json()
+                delay = self._delay(attempt, response.headers.get("Retry-After"))
+                if response.status_code == 429:
+                    self.limiter.pause(delay)
+            attempt += 1
+            self._count("retries")
+            perf.incr("airtable_retries", method=method)
+            time.sleep(delay)
+
+    def _record(self, method, outcome, seconds, size):
+        perf.observe("airtable_request_seconds", seconds, method=method)
+        perf.incr("airtable_requests", method=method, status=outcome)
+        perf.incr("airtable_response_bytes", size, method=method)
+        self._count("requests")
+        self._count("seconds", seconds)
+        self._count("bytes", size)
+
+    def _delay(self, attempt, retry_after=None):
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+        # Exponential backoff with jitter: ~1s, 2s, 4s, ...
+        return self.backoff * 2 ** attempt * random.uniform(0.75, 1.25)
+
+    def list_records(self, formula=None, fields=None):
+        """All records (every page), optionally filtered by a formula and projected to `fields`"""
+        all_records = []
+        offset = None
+
+        while True:
+            params = {"pageSize": PAGE_SIZE}
+            if offset:
+                params["offset"] = offset
+            if formula:
+                params["filterByFormula"] = formula
+            if fields:
+                params["fields[]"] = list(fields)
+
+            data = self.request("GET", params=params)
+            self._count("pages")
+            perf.incr("airtable_pages")
+            all_records.extend(data.get("records", []))
+
+            offset = data.get("offset")
+            if not offset:
+                break
+
+        return all_records
+
+    def get_record(self, record_id):
+        return self.request("GET", record_id)
+
+    def update_records(self, updates):
+        """PATCH up to BATCH_SIZE {"id", "fields"} updates; returns the updated records"""
+        return self.request("PATCH", json={"records": updates}).get("records", [])
@@ -0,0 +1,226 @@
+"""
+Benchmark: metrics engine vs. the original multi-scan calculate_metrics
+
+Usage:
+    python benchmarks/bench_metrics.py            # 10k and 100k records
+    python benchmarks/bench_metrics.py 5000 50000
+
+Reports, per dataset size:
+  legacy      original calculate_metrics() (one scan per breakdown)
+  single-pass metrics.calculate_metrics() from raw records (normalise + aggregate)
+  rebuild     aggregate rebuilt from already-normalised rows
+  memoized    RecordCache.get_metrics() on a loaded, unchanged snapshot
+  incremental one changed record applied to the running aggregate
+
+The dashboard only pays for "single-pass" when a worker loads a full
+snapshot; every later request is "memoized" and every changed record is
+"incremental". "single-pass" builds a row per record so that changes can
+be applied incrementally afterwards, and it remains slower than the legacy
+column scans: about 1.7x at 10k records and 1.25x at 100k.
+"""
+
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from metrics import MetricsAggregate, calculate_metrics, normalize_fields  # noqa: E402
+from record_cache import SNAPSHOT_FIELDS, RecordCache  # noqa: E402
+from synthetic import synthetic_records  # noqa: E402
+
+
+def legacy_calculate_metrics(records):
+    """calculate_metrics() as it was before the metrics engine (kept as the baseline)"""
+    fields_list = [r.get("fields", {}) for r in records]
+
+    total_applications = len(fields_list)
+
+    sources = [f.get("Source", "Unknown") for f in fields_list]
+    source_breakdown = Counter(sources)
+    source_breakdown = dict(sorted(source_breakdown.items(), key=lambda x: x[1], reverse=True))
+
+    levels = [f.get("Filt_Level", "Unknown") for f in fields_list]
+    level_breakdown = Counter(levels)
+    level_order = {"Level 5": 1, "Level 4": 2, "Level 3": 3, "Unknown": 4}
+    level_breakdown = dict(sorted(level_breakdown.items(), key=lambda x: level_order.get(x[0], 5)))
+
+    top_tier_mba = []
+    mba_institutions = []
+    for f in fields_list:
+        if f.get("is_Top-Tier", "").lower() == "yes":
+            top_tier_mba.append(f)
+            inst = f.get("MBA_Institution_Name", "Unknown")
+            if inst and inst not in ["N/A", "Not specified", ""]:
+                mba_institutions.append(inst)
+
+    mba_institution_breakdown = Counter(mba_institutions)
+    mba_institution_breakdown = dict(sorted(mba_institution_breakdown.items(), key=lambda x: x[1], reverse=True))
+
+    top_tier_ug = []
+    ug_institutions = []
+    for f in fields_list:
+        is_top_tier_ug = f.get("UG_School_Top_Tier", "").lower() == "yes"
+        is_top_tier_mba = f.get("is_Top-Tier", "").lower() == "yes"
+
+        if is_top_tier_ug and not is_top_tier_mba:
+            top_tier_ug.append(f)
+            inst = f.get("Undergrad_School_Name", "Unknown")
+            if inst and inst not in ["N/A", "Not specified", ""]:
+                ug_institutions.append(inst)
+
+    ug_institution_breakdown = Counter(ug_institutions)
+    ug_institution_breakdown = dict(sorted(ug_institution_breakdown.items(), key=lambda x: x[1], reverse=True))
+
+    video_submissions = []
+    for f in fields_list:
+        video_link = f.get("Video_Link", "").strip()
+        if video_link:
+            video_submissions.append(f)
+
+    video_count = len(video_submissions)
+
+    video_levels = [f.get("Filt_Level", "Unknown") for f in video_submissions]
+    video_level_breakdown = Counter(video_levels)
+    video_level_breakdown = dict(sorted(video_level_breakdown.items(), key=lambda x: level_order.get(x[0], 5)))
+
+    video_mba_breakdown = {"Top-Tier MBA": 0, "Other MBA": 0, "No MBA": 0}
+    video_mba_institutions = []
+    for f in video_submissions:
+        has_mba = f.get("Has_MBA", "").lower() == "yes"
+        is_top_tier = f.get("is_Top-Tier", "").lower() == "yes"
+
+        if is_top_tier:
+            video_mba_breakdown["Top-Tier MBA"] += 1
+            inst = f.get("MBA_Institution_Name", "Unknown")
+            if inst and inst not in ["N/A", "Not specified", ""]:
+                video_mba_institutions.append(inst)
+        elif has_mba:
+            video_mba_breakdown["Other MBA"] += 1
+        else:
+            video_mba_breakdown["No MBA"] += 1
+
+    video_mba_institution_breakdown = Counter(video_mba_institutions)
+    video_mba_institution_breakdown = dict(sorted(video_mba_institution_breakdown.items(), key=lambda x: x[1], reverse=True))
+
+    video_stage_breakdown = {"Selected": 0, "Rejected": 0, "Not Reviewed": 0}
+    for f in video_submissions:
+        stage = f.get("Stage 1 Status", "").strip()
+        if stage == "Selected":
+            video_stage_breakdown["Selected"] += 1
+        elif stage == "Rejected":
+            video_stage_breakdown["Rejected"] += 1
+        else:
+            video_stage_breakdown["Not Reviewed"] += 1
+
+    ai_rec_breakdown = {"Strong Yes": 0, "Yes": 0, "Maybe": 0, "No": 0, "Not Evaluated": 0}
+    for f in video_submissions:
+        ai_rec = f.get("AI_Rec", "").strip()
+        if ai_rec in ai_rec_breakdown:
+            ai_rec_breakdown[ai_rec] += 1
+        else:
+            ai_rec_breakdown["Not Evaluated"] += 1
+
+    transcript_processed = 0
+    transcript_not_processed = 0
+    for f in video_submissions:
+        stage1_status = f.get("Stage 1 Status", "").strip()
+        if stage1_status == "Rejected":
+            continue
+        ai_status = f.get("AI_Status", "").strip()
+        if ai_status == "Completed":
+            transcript_processed += 1
+        else:
+            transcript_not_processed += 1
+
+    return {
+        "total_applications": total_applications,
+        "source_breakdown": source_breakdown,
+        "level_breakdown": level_breakdown,
+        "top_tier_mba_count": len(top_tier_mba),
+        "mba_institutions": mba_institution_breakdown,
+        "top_tier_ug_count": len(top_tier_ug),
+        "ug_institutions": ug_institution_breakdown,
+        "video_count": video_count,
+        "video_level_breakdown": video_level_breakdown,
+        "video_mba_breakdown": video_mba_breakdown,
+        "video_mba_institutions": video_mba_institution_breakdown,
+        "video_stage_breakdown": video_stage_breakdown,
+        "ai_rec_breakdown": ai_rec_breakdown,
+        "transcript_processed": transcript_processed,
+        "transcript_not_processed": transcript_not_processed
+    }
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def loaded_cache(records, directory):
+    """A RecordCache whose store holds `records`, loaded into memory (search index off)"""
+    airtable = SimpleNamespace(update_records=None)  # never called: the benchmark only reads
+    cache = RecordCache("bench", "Bench", airtable, os.path.join(directory, "records.db"), memory_budget=1)
+    cache.state["search"] = None
+    now = time.time()
+    cache.store.write(upserts=[dict(r, fields={k: v for k, v in r["fields"].items() if k in SNAPSHOT_FIELDS})
+                               for r in records],
+                      meta={"synced_at": now, "last_sync": now, "last_reconcile": now,
+                            "snapshot_fields": SNAPSHOT_FIELDS})
+    cache.load_snapshot(cache.store.meta())
+    return cache
+
+
+def run(count):
+    records = synthetic_records(count)
+    assert calculate_metrics(records) == legacy_calculate_metrics(records), "metrics differ from legacy"
+
+    rows = {r["id"]: normalize_fields(r["fields"]) for r in records}
+    aggregate = MetricsAggregate(list(rows.values()))
+    with tempfile.TemporaryDirectory() as directory:
+        cache = loaded_cache(records, directory)
+        assert cache.get_metrics() == legacy_calculate_metrics(
+            [r for r in records if r["id"] in cache.state["metrics_rows"]]
+        ), "cached metrics differ from legacy"
+        memoized = best_of(cache.get_metrics, 1000)
+
+    target = records[count // 2]
+
+    def incremental():
+        old = rows[target["id"]]
+        target["fields"]["Stage 1 Status"] = "Selected" if old.stage != "Selected" else "Rejected"
+        new = normalize_fields(target["fields"])
+        aggregate.remove(old)
+        aggregate.add(new)
+        rows[target["id"]] = new
+        aggregate.as_dict()
+
+    timings = {
+        "legacy": best_of(lambda: legacy_calculate_metrics(records), 5),
+        "single-pass": best_of(lambda: calculate_metrics(records), 5),
+        "rebuild": best_of(lambda: MetricsAggregate(list(rows.values())).as_dict(), 5),
+        "memoized": memoized,
+        "incremental": best_of(incremental, 1000),
+    }
+    assert aggregate.as_dict() == legacy_calculate_metrics(records), "incremental aggregate drifted"
+    return timings
+
+
+def main(sizes):
+    print(f"{'records':>8}  {'variant':<12} {'time':>11}  {'vs legacy':>9}")
+    for count in sizes:
+        timings = run(count)
+        for name, seconds in timings.items():
+            speedup = timings["legacy"] / seconds if seconds else float("inf")
+            print(f"{count:>8}  {name:<12} {seconds * 1000:>8.3f} ms  {speedup:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10_000, 100_000])
@@ -0,0 +1,306 @@
+"""
+Local stand-ins for Airtable and the Hiring API
+Lets the dashboard run (and be benchmarked) without touching the live base
+
+Usage:
+    python benchmarks/fake_services.py --records 10000
+    AIRTABLE_API_URL=http://127.0.0.1:8701/v0 HIRING_API_URL=http://127.0.0.1:8702 gunicorn main:app
+
+FakeAirtable implements the parts of the records API the dashboard uses:
+list with pageSize / offset / fields[] / the modified-since filterByFormula,
+get one record, and single or batch PATCH. Latency and 429s can be injected.
+Resume_pdf attachments are served from signed URLs that expire after
+attachment_ttl seconds, like Airtable's attachment CDN.
+FakeHiringAPI answers the evaluate endpoint after a configurable delay and
+writes AI results back into the fake base, like the real service does.
+"""
+
+import argparse
+import calendar
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from synthetic import synthetic_records
+
+
+SINCE_PATTERN = re.compile(r"DATETIME_PARSE\('([^']+)'\)")
+PDF_HEADER = b"%PDF-1.4\n"
+
+
+class FakeAirtable:
+    """In-memory Airtable table served over HTTP.
+
+    latency         -- seconds added to every request
+    error_rate      -- fraction of requests answered with 429
+    rate_limit      -- requests per second before answering 429 (None: unlimited)
+    attachment_ttl  -- seconds an attachment URL stays valid
+    """
+
+    def __init__(self, records, latency=0.0, error_rate=0.0, rate_limit=None, attachment_ttl=2 * 60 * 60,
+                 seed=0):
+        self.records = {}
+        self.modified = {}
+        self.attachment_sizes = {}
+        self.lock = threading.Lock()
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.attachment_ttl = attachment_ttl
+        self.base_url = None  # set once the server is listening; attachment URLs point here
+        self.rng = random.Random(seed)
+        self.stats = {"requests": 0, "throttled": 0, "pages": 0, "patched": 0, "attachments": 0, "expired": 0}
+        self._window = []
+        self.put(records, modified=time.time() - 24 * 60 * 60)
+
+    def put(self, records, modified=None):
+        """Add or replace records (bumping their modified time)"""
+        with self.lock:
+            for record in records:
+                self.records[record["id"]] = {
+                    "id": record["id"],
+                    "createdTime": record.get("createdTime", "2026-01-01T00:00:00.000Z"),
+                    "fields": dict(record.get("fields", {}))
+                }
+                self.modified[record["id"]] = modified or time.time()
+                for attachment in record.get("fields", {}).get("Resume_pdf", []):
+                    self.attachment_sizes[attachment["id"]] = attachment.get("size", 1024)
+
+    def update(self, record_id, fields):
+        """Apply a field update like Airtable does (None / "" clears the field)"""
+        with self.lock:
+            record = self.records[record_id]
+            for key, value in fields.items():
+                if value in (None, ""):
+                    record["fields"].pop(key, None)
+                else:
+                    record["fields"][key] = value
+            self.modified[record_id] = time.time()
+            return self._present(record)
+
+    def _present(self, record, fields=None):
+        """Copy of a record as the API returns it, with freshly signed attachment URLs"""
+        copy = _copy(record, fields)
+        if self.base_url and copy["fields"].get("Resume_pdf"):
+            expires = int(time.time() + self.attachment_ttl)
+            copy["fields"]["Resume_pdf"] = [
+                dict(attachment, url=f"{self.base_url}/attachments/{attachment['id']}/{attachment['filename']}"
+                                     f"?expires={expires}")
+                for attachment in copy["fields"]["Resume_pdf"]
+            ]
+        return copy
+
+    def attachment(self, attachment_id, query):
+        """Attachment bytes, or 410 once the signed URL has expired"""
+        if int(query.get("expires", ["0"])[0]) < time.time():
+            with self.lock:
+                self.stats["expired"] += 1
+            return 410, {"error": "URL expired"}
+        with self.lock:
+            size = self.attachment_sizes.get(attachment_id)
+            self.stats["attachments"] += 1
+        if size is None:
+            return 404, {"error": "NOT_FOUND"}
+        return 200, PDF_HEADER + b"0" * max(0, size - len(PDF_HEADER))
+
+    def throttled(self):
+        """True if this request should get a 429"""
+        with self.lock:
+            self.stats["requests"] += 1
+            if self.error_rate and self.rng.random() < self.error_rate:
+                self.stats["throttled"] += 1
+                return True
+            if self.rate_limit:
+                now = time.monotonic()
+                self._window = [t for t in self._window if now - t < 1]
+                if len(self._window) >= self.rate_limit:
+                    self.stats["throttled"] += 1
+                    return True
+                self._window.append(now)
+        return False
+
+    def list(self, query):
+        page_size = min(100, int(query.get("pageSize", ["100"])[0]))
+        offset = int(query.get("offset", ["0"])[0])
+        fields = query.get("fields[]")
+        formula = query.get("filterByFormula", [None])[0]
+
+        with self.lock:
+            ids = list(self.records)
+            if formula:
+                match = SINCE_PATTERN.search(formula)
+                if match is None:
+                    return 422, {"error": {"type": "INVALID_FILTER_BY_FORMULA"}}
+                since = calendar.timegm(time.strptime(match.group(1), "%Y-%m-%dT%H:%M:%S.000Z"))
+                ids = [record_id for record_id in ids if self.modified[record_id] > since]
+            page = [self._present(self.records[record_id], fields) for record_id in ids[offset:offset + page_size]]
+            self.stats["pages"] += 1
+
+        body = {"records": page}
+        if offset + page_size < len(ids):
+            body["offset"] = str(offset + page_size)
+        return 200, body
+
+    def get(self, record_id):
+        with self.lock:
+            record = self.records.get(record_id)
+            return (200, self._present(record)) if record else (404, {"error": "NOT_FOUND"})
+
+    def patch(self, record_id, body):
+        items = body["records"] if record_id is None else [{"id": record_id, "fields": body.get("fields", {})}]
+        if len(items) > 10:
+            return 422, {"error": {"type": "INVALID_RECORDS", "message": "Max 10 records per request"}}
+        if any(item["id"] not in self.records for item in items):
+            return 422, {"error": {"type": "ROW_DOES_NOT_EXIST"}}
+        updated = [self.update(item["id"], item.get("fields", {})) for item in items]
+        with self.lock:
+            self.stats["patched"] += len(updated)
+        return 200, {"records": updated} if record_id is None else updated[0]
+
+    def handler(self):
+        airtable = self
+
+        class Handler(_JSONHandler):
+            def route(self, method, path, query, body):
+                parts = path.strip("/").split("/")  # v0 / base / table [/ record]
+                if parts[0] == "attachments":
+                    return airtable.attachment(parts[1], query)
+                time.sleep(airtable.latency)
+                if airtable.throttled():
+                    return 429, {"errors": [{"error": "RATE_LIMIT_REACHED"}]}
+                record_id = parts[3] if len(parts) > 3 else None
+                if method == "GET":
+                    return airtable.get(record_id) if record_id else airtable.list(query)
+                if method == "PATCH":
+                    return airtable.patch(record_id, body)
+                return 405, {"error": "METHOD_NOT_ALLOWED"}
+
+        return Handler
+
+
+class FakeHiringAPI:
+    """Evaluate endpoint that takes `delay` seconds and writes AI fields back"""
+
+    def __init__(self, airtable, delay=2.0, seed=0):
+        self.airtable = airtable
+        self.delay = delay
+        self.rng = random.Random(seed)
+        self.stats = {"evaluations": 0}
+
+    def handler(self):
+        api = self
+
+        class Handler(_JSONHandler):
+            def route(self, method, path, query, body):
+                if method != "POST" or not path.endswith("/api/v1/evaluations/evaluate"):
+                    return 404, {"error": "Not found"}
+                record_id = (body or {}).get("record_id")
+                if record_id not in api.airtable.records:
+                    return 404, {"error": f"Record {record_id} not found"}
+                time.sleep(api.delay)
+                api.airtable.update(record_id, {
+                    "AI_Status": "Completed",
+                    "AI_Eval": round(api.rng.uniform(1, 5), 2),
+                    "AI_Mindset": api.rng.choice(["Growth", "Fixed", "Mixed"]),
+                    "AI_Rec": api.rng.choice(["Strong Yes", "Yes", "Maybe", "No"]),
+                    "AI_Report_URL": f"https://reports.example.com/{record_id}"
+                })
+                api.stats["evaluations"] += 1
+                return 200, {"success": True, "record_id": record_id}
+
+        return Handler
+
+
+class _JSONHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real APIs
+
+    def log_message(self, *args):
+        pass
+
+    def _handle(self, method):
+        url = urlparse(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length)) if length else None
+        status, payload = self.route(method, url.path, parse_qs(url.query), body)
+        binary = isinstance(payload, bytes)
+        data = payload if binary else json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/pdf" if binary else "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_PATCH(self):
+        self._handle("PATCH")
+
+
+def serve(handler, port=0):
+    """Run a handler class on 127.0.0.1 in a daemon thread; returns the server"""
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def start_services(records, airtable_port=0, hiring_port=0, latency=0.0, error_rate=0.0,
+                   rate_limit=None, eval_delay=2.0, attachment_ttl=2 * 60 * 60):
+    """Start both fakes; returns (airtable, hiring_api, airtable_url, hiring_url, servers)"""
+    airtable = FakeAirtable(records, latency=latency, error_rate=error_rate, rate_limit=rate_limit,
+                            attachment_ttl=attachment_ttl)
+    hiring_api = FakeHiringAPI(airtable, delay=eval_delay)
+    airtable_server = serve(airtable.handler(), airtable_port)
+    hiring_server = serve(hiring_api.handler(), hiring_port)
+    airtable.base_url = f"http://127.0.0.1:{airtable_server.server_port}"
+    airtable_url = f"{airtable.base_url}/v0"
+    hiring_url = f"http://127.0.0.1:{hiring_server.server_port}"
+    return airtable, hiring_api, airtable_url, hiring_url, (airtable_server, hiring_server)
+
+
+def _copy(record, fields=None):
+    values = record["fields"]
+    if fields:
+        values = {key: value for key, value in values.items() if key in fields}
+    return {"id": record["id"], "createdTime": record["createdTime"], "fields": dict(values)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=10_000)
+    parser.add_argument("--airtable-port", type=int, default=8701)
+    parser.add_argument("--hiring-port", type=int, default=8702)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every Airtable request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of Airtable requests answered 429")
+    parser.add_argument("--rate-limit", type=int, default=None, help="Airtable requests/second before 429")
+    parser.add_argument("--eval-delay", type=float, default=2.0, help="seconds per evaluation")
+    args = parser.parse_args()
+
+    _, _, airtable_url, hiring_url, _ = start_services(
+        synthetic_records(args.records),
+        airtable_port=args.airtable_port,
+        hiring_port=args.hiring_port,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        rate_limit=args.rate_limit,
+        eval_delay=args.eval_delay
+    )
+    print(f"AIRTABLE_API_URL={airtable_url}")
+    print(f"HIRING_API_URL={hiring_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,349 @@
+"""
+Benchmark: the dashboard under concurrent load, served by gunicorn against
+local fakes of Airtable and the Hiring API (benchmarks/fake_services.py)
+
+Usage:
+    python benchmarks/load_test.py                        # 1k and 10k records
+    python benchmarks/load_test.py --records 1000 10000 100000 --workers 4
+    python benchmarks/load_test.py --latency 0.2 --error-rate 0.05
+    python benchmarks/load_test.py --compare benchmarks/results/baseline.json
+
+For each dataset size it starts the fakes and a gunicorn server, then reports:
+  cold start  seconds from launching gunicorn to the first /api/metrics answer
+              (includes the full Airtable crawl)
+  endpoints   p50 / p90 / p99 latency, throughput and errors for each scenario,
+              run for --duration seconds with --concurrency client threads
+  memory      resident memory of the gunicorn master and each worker
+  airtable    requests, pages, 429s and patched records seen by the fake
+
+Results are written to benchmarks/results/ as JSON; --compare prints the
+change against an earlier results file, matched by dataset size and scenario.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+
+from fake_services import start_services
+from synthetic import synthetic_records
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+STARTUP_TIMEOUT = 600  # a 100k crawl through a rate-limited fake takes a while
+
+
+def scenarios(record_ids):
+    """(name, method, path, body factory) for every measured request mix"""
+    statuses = ["Selected", "Rejected", ""]
+    return [
+        ("index", "GET", "/", None),
+        ("metrics", "GET", "/api/metrics", None),
+        ("video_submitters", "GET", "/api/video-submitters", None),
+        ("video_submitters_filtered", "GET",
+         "/api/video-submitters?level=Level+5&mba=top-tier&sort=ai_eval&limit=100", None),
+        ("video_submitters_search", "GET", "/api/video-submitters?name=sharma&page=2", None),
+        ("full_text_search", "GET", "/api/search?q=transcript:%22health+score%22+sharm", None),
+        ("update_status", "POST", "/api/update-status",
+         lambda rng: {"record_id": rng.choice(record_ids), "status": rng.choice(statuses)}),
+        ("update_comments", "POST", "/api/update-comments",
+         lambda rng: {"record_id": rng.choice(record_ids), "comments": f"Benchmark note {rng.random():.6f}"}),
+    ]
+
+
+# ── gunicorn ──
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_gunicorn(port, workers, threads, env):
+    command = [
+        sys.executable, "-m", "gunicorn", "main:app",
+        "--bind", f"127.0.0.1:{port}",
+        "--workers", str(workers),
+        "--worker-class", "gthread",
+        "--threads", str(threads),
+        "--timeout", str(STARTUP_TIMEOUT),
+        "--log-level", "warning",
+    ]
+    return subprocess.Popen(command, cwd=ROOT, env=env, start_new_session=True)
+
+
+def stop_gunicorn(process):
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout=30)
+    except (ProcessLookupError, subprocess.TimeoutExpired):
+        os.killpg(process.pid, signal.SIGKILL)
+
+
+def wait_until_ready(base_url, process):
+    """Seconds until /api/metrics first answers 200"""
+    start = time.perf_counter()
+    deadline = start + STARTUP_TIMEOUT
+    while time.perf_counter() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with status {process.returncode}")
+        try:
+            if requests.get(f"{base_url}/api/metrics", timeout=STARTUP_TIMEOUT).status_code == 200:
+                return time.perf_counter() - start
+        except requests.ConnectionError:
+            time.sleep(0.05)
+    raise RuntimeError("gunicorn did not become ready")
+
+
+def memory_usage(master_pid):
+    """Resident memory (MB) of the gunicorn master and its workers, from /proc"""
+    workers = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # The command name may contain spaces; ppid is the 2nd field after it
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        if ppid == master_pid:
+            workers.append(int(entry))
+    return {
+        "master_mb": _rss_mb(master_pid),
+        "workers_mb": sorted(filter(None, (_rss_mb(pid) for pid in workers))),
+    }
+
+
+def _rss_mb(pid):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
+
+# ── Load ──
+
+def run_scenario(base_url, method, path, make_body, concurrency, duration, seed=0):
+    """Hammer one endpoint from `concurrency` threads for `duration` seconds"""
+    latencies, errors = [], {}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def client(index):
+        rng = random.Random(seed + index)
+        session = requests.Session()
+        local_latencies, local_errors = [], {}
+        while time.perf_counter() < deadline:
+            body = make_body(rng) if make_body else None
+            start = time.perf_counter()
+            try:
+                response = session.request(method, base_url + path, json=body, timeout=60)
+                outcome = response.status_code
+                response.content
+            except requests.RequestException as e:
+                outcome = type(e).__name__
+            elapsed = time.perf_counter() - start
+            if outcome in (200, 304):
+                local_latencies.append(elapsed)
+            else:
+                local_errors[str(outcome)] = local_errors.get(str(outcome), 0) + 1
+        with lock:
+            latencies.extend(local_latencies)
+            for key, count in local_errors.items():
+                errors[key] = errors.get(key, 0) + count
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": len(latencies) + sum(errors.values()),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "mean_ms": _ms(sum(latencies) / len(latencies)) if latencies else None,
+        "p50_ms": _ms(percentile(latencies, 0.50)),
+        "p90_ms": _ms(percentile(latencies, 0.90)),
+        "p99_ms": _ms(percentile(latencies, 0.99)),
+        "max_ms": _ms(latencies[-1]) if latencies else None,
+    }
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of sorted values"""
+    if not values:
+        return None
+    return values[min(len(values) - 1, max(0, int(round(q * len(values))) - 1))]
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 2) if seconds is not None else None
+
+
+def run(count, args):
+    records = synthetic_records(count)
+    airtable, _, airtable_url, hiring_url, servers = start_services(
+        records, latency=args.latency, error_rate=args.error_rate,
+        rate_limit=args.rate_limit, eval_delay=args.eval_delay
+    )
+    record_ids = [record["id"] for record in records if "Video_Link" in record["fields"]]
+    del records
+
+    workdir = tempfile.mkdtemp(prefix="dashboard-bench-")
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    env = dict(
+        os.environ,
+        AIRTABLE_PAT="bench",
+        AIRTABLE_BASE_ID="appBenchmark",
+        AIRTABLE_TABLE_ID="tblCandidates",
+        AIRTABLE_API_URL=airtable_url,
+        HIRING_API_URL=hiring_url,
+        CACHE_DB_PATH=os.path.join(workdir, "records.db"),
+        JOBS_DB_PATH=os.path.join(workdir, "jobs.db"),
+    )
+
+    process = start_gunicorn(port, args.workers, args.threads, env)
+    try:
+        cold_start = wait_until_ready(base_url, process)
+        print(f"\n{count} records: cold start {cold_start:.2f}s")
+        print(f"{'scenario':<28}{'req/s':>9}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'errors':>8}")
+
+        # Every worker loads the snapshot before anything is timed
+        for _ in range(args.workers * 4):
+            requests.get(f"{base_url}/api/metrics", timeout=STARTUP_TIMEOUT)
+
+        endpoints = {}
+        for name, method, path, make_body in scenarios(record_ids):
+            if args.only and name not in args.only:
+                continue
+            result = run_scenario(base_url, method, path, make_body, args.concurrency, args.duration)
+            endpoints[name] = result
+            print(f"{name:<28}{result['throughput_rps']:>9}{_fmt(result['p50_ms']):>10}"
+                  f"{_fmt(result['p90_ms']):>10}{_fmt(result['p99_ms']):>10}{sum(result['errors'].values()):>8}")
+
+        memory = memory_usage(process.pid)
+        print(f"memory: master {memory['master_mb']} MB, workers {memory['workers_mb']} MB")
+    finally:
+        stop_gunicorn(process)
+        for server in servers:
+            server.shutdown()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        "records": count,
+        "cold_start_seconds": round(cold_start, 3),
+        "endpoints": endpoints,
+        "memory": memory,
+        "airtable": dict(airtable.stats),
+    }
+
+
+def _fmt(value):
+    return "-" if value is None else f"{value:.2f}"
+
+
+# ── Results ──
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def save(results, path=None):
+    if path is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, time.strftime("load-%Y%m%d-%H%M%S.json"))
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+    return path
+
+
+def compare(results, baseline):
+    """Print p50 / p99 / throughput changes against a baseline results file"""
+    before = {
+        (run["records"], name): endpoint
+        for run in baseline["runs"] for name, endpoint in run["endpoints"].items()
+    }
+    cold = {run["records"]: run["cold_start_seconds"] for run in baseline["runs"]}
+    print(f"\nvs {baseline['meta'].get('commit') or 'baseline'} ({baseline['meta']['timestamp']})")
+    print(f"{'records':>8}  {'scenario':<28}{'p50':>10}{'p99':>10}{'req/s':>10}")
+    for run in results["runs"]:
+        if run["records"] in cold:
+            print(f"{run['records']:>8}  {'cold start':<28}"
+                  f"{_change(cold[run['records']], run['cold_start_seconds']):>10}")
+        for name, endpoint in run["endpoints"].items():
+            old = before.get((run["records"], name))
+            if old is None:
+                continue
+            print(f"{run['records']:>8}  {name:<28}"
+                  f"{_change(old['p50_ms'], endpoint['p50_ms']):>10}"
+                  f"{_change(old['p99_ms'], endpoint['p99_ms']):>10}"
+                  f"{_change(old['throughput_rps'], endpoint['throughput_rps']):>10}")
+
+
+def _change(old, new):
+    if not old or new is None:
+        return "-"
+    return f"{(new - old) / old * 100:+.1f}%"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, nargs="+", default=[1_000, 10_000])
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--concurrency", type=int, default=16, help="client threads per scenario")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per scenario")
+    parser.add_argument("--only", nargs="+", help="run only these scenarios")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every Airtable request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of Airtable requests answered 429")
+    parser.add_argument("--rate-limit", type=int, default=None, help="Airtable requests/second before 429")
+    parser.add_argument("--eval-delay", type=float, default=2.0, help="seconds per evaluation")
+    parser.add_argument("--output", help="results file (default: benchmarks/results/load-<time>.json)")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    args = parser.parse_args()
+
+    results = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+            "args": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        },
+        "runs": [run(count, args) for count in args.records],
+    }
+    print(f"\nSaved {save(results, args.output)}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Synthetic candidate records for benchmarks
+Airtable-shaped records with every field the dashboard reads, in roughly
+the proportions seen in the live base
+"""
+
+import random
+
+
+MBA_SCHOOLS = ["IIM Ahmedabad", "IIM Bangalore", "IIM Calcutta", "ISB", "INSEAD", "Wharton",
+               "XLRI", "FMS Delhi", "N/A", "Not specified"]
+UG_SCHOOLS = ["IIT Delhi", "IIT Bombay", "IIT Madras", "BITS Pilani", "SRCC", "St. Stephen's",
+              "Delhi University", "Mumbai University", "N/A"]
+SOURCES = ["LinkedIn", "LinkedIn", "LinkedIn", "student_application", "alumni_referral"]
+FIRST_NAMES = ["Aarav", "Diya", "Ishaan", "Meera", "Kabir", "Ananya", "Rohan", "Sara", "Vikram", "Priya"]
+LAST_NAMES = ["Sharma", "Iyer", "Reddy", "Kapoor", "Menon", "Gupta", "Nair", "Bose", "Khan", "Das"]
+LOREM = ("Led customer success for enterprise accounts, owned renewals and expansion, "
+         "built onboarding playbooks and partnered with product on retention. ")
+TRANSCRIPT_SENTENCES = [
+    "In my last role I managed a portfolio of forty enterprise customers.",
+    "We reduced churn by redesigning the onboarding journey.",
+    "I built a health score that combined product usage with support tickets.",
+    "Quarterly business reviews helped us find expansion opportunities early.",
+    "When a renewal was at risk I brought in the product team directly.",
+    "I hired and coached a team of six customer success managers.",
+    "Net revenue retention went from ninety two to one hundred and eleven percent.",
+    "I think escalations are a chance to earn the customer's trust.",
+    "We moved from reactive firefighting to a proactive success plan.",
+    "I worked closely with sales on handoffs and account planning.",
+    "Our NPS improved after we introduced a dedicated implementation phase.",
+    "I like to start every account with clear, measurable outcomes.",
+    "Automation in our CRM freed up time for strategic conversations.",
+    "The hardest customer I had was a logistics company in Pune.",
+    "I learned SQL so I could pull usage data without waiting on analysts.",
+    "Scaling the playbook across regions meant documenting everything.",
+]
+ANALYSIS_SENTENCES = [
+    "Candidate shows strong ownership of retention outcomes.",
+    "Communication is clear and structured, with concrete metrics.",
+    "Limited experience leading teams; mostly individual contributor work.",
+    "Demonstrates a growth mindset and curiosity about data.",
+    "Answers were generic and lacked specific customer examples.",
+    "Strong stakeholder management across sales and product.",
+    "Experience is mostly SMB; enterprise exposure is unclear.",
+    "Good grasp of churn drivers and health scoring.",
+]
+
+
+def synthetic_record(i, rng):
+    """One Airtable record dict (id, createdTime, fields)"""
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    has_mba = rng.random() < 0.45
+    fields = {
+        "Applicant_Name": name,
+        "Applicant_Email": f"{name.lower().replace(' ', '.')}.{i}@example.com",
+        "Applicant_Phone": f"+91 98{rng.randrange(10**8):08d}",
+        "Source": rng.choice(SOURCES),
+        "Filt_Level": rng.choice(["Level 5", "Level 4", "Level 3", "Level 3", "Level 3"]),
+        "Has_MBA": "Yes" if has_mba else "No",
+        "is_Top-Tier": "Yes" if has_mba and rng.random() < 0.4 else "No",
+        "MBA_Institution_Name": rng.choice(MBA_SCHOOLS) if has_mba else "N/A",
+        "UG_School_Top_Tier": rng.choice(["Yes", "No", "No"]),
+        "Undergrad_School_Name": rng.choice(UG_SCHOOLS),
+        "Total_Exp": str(rng.randint(1, 20)),
+        "Relevant_Exp": str(rng.randint(0, 12)),
+        "Resume_pdf": [{
+            "id": f"att{i:08d}",
+            "url": f"https://dl.airtable.example/{i}/resume.pdf",
+            "filename": "resume.pdf",
+            "size": rng.randint(40_000, 400_000),
+            "type": "application/pdf"
+        }],
+        # Long text the dashboard never reads; SNAPSHOT_FIELDS should skip it
+        "Resume_Text": LOREM * rng.randint(2, 10),
+    }
+    if rng.random() < 0.3:
+        fields["Video_Link"] = f"https://video.example.com/{i}"
+        fields["Stage 1 Status"] = rng.choice(["Selected", "Rejected", "", ""])
+        if rng.random() < 0.8:
+            fields["Video_link_transcript"] = " ".join(rng.choices(TRANSCRIPT_SENTENCES, k=rng.randint(8, 30)))
+        if rng.random() < 0.6:
+            fields["AI_Status"] = "Completed"
+            fields["Analysis_explanation"] = " ".join(rng.choices(ANALYSIS_SENTENCES, k=rng.randint(2, 5)))
+            fields["AI_Eval"] = round(rng.uniform(1, 5), 2)
+            fields["AI_Mindset"] = rng.choice(["Growth", "Fixed", "Mixed"])
+            fields["AI_Rec"] = rng.choice(["Strong Yes", "Yes", "Maybe", "No"])
+            fields["AI_Report_URL"] = f"https://reports.example.com/{i}"
+        if rng.random() < 0.2:
+            fields["Reviewer Comments"] = "Strong communicator, follow up on enterprise experience"
+    if rng.random() < 0.1:
+        fields["Comments"] = rng.choice(["Referred by alumni network", "Applied twice", "Relocating to Bangalore"])
+    if rng.random() < 0.005:
+        fields["Applicant_Email"] = f"test{i}@example.com"
+
+    # Airtable omits empty fields
+    fields = {key: value for key, value in fields.items() if value not in ("", None)}
+    return {"id": f"rec{i:014d}", "createdTime": "2026-01-01T00:00:00.000Z", "fields": fields}
+
+
+def synthetic_records(count, seed=42):
+    """`count` records, reproducible for a given seed"""
+    rng = random.Random(seed)
+    return [synthetic_record(i, rng) for i in range(count)]
@@ -0,0 +1,240 @@
+"""
+Candidate list index for Section 3
+Slim rows for every video submitter plus the lookup sets and sort orders
+that /api/video-submitters filters, sorts and pages with
+"""
+
+import re
+
+LEVEL_ORDER = {"Level 5": 1, "Level 4": 2, "Level 3": 3}
+AI_REC_RANK = {"Strong Yes": 4, "Yes": 3, "Maybe": 2, "No": 1}
+SORT_COLUMNS = ("level", "exp", "ai_eval", "ai_rec")
+LEVEL_NUMBER = re.compile(r"Level (\d+)")
+
+# Airtable columns build_row() reads
+ROW_FIELDS = [
+    "Video_Link", "AI_Rec", "Resume_pdf", "Applicant_Name", "Source", "Applicant_Email",
+    "Applicant_Phone", "MBA_Institution_Name", "Has_MBA", "is_Top-Tier", "Total_Exp",
+    "Relevant_Exp", "Filt_Level", "Stage 1 Status", "Undergrad_School_Name", "UG_School_Top_Tier",
+    "Reviewer Comments", "AI_Eval", "AI_Mindset", "AI_Report_URL", "AI_Status", "Video_link_transcript",
+]
+
+
+def build_row(record):
+    """Slim list row for a video submitter, or None if the record is not listed"""
+    fields = record.get("fields", {})
+    video_link = fields.get("Video_Link", "").strip()
+    if not video_link:
+        return None
+
+    # Skip candidates rejected after video evaluation
+    ai_rec = fields.get("AI_Rec", "").strip()
+    if ai_rec == "No":
+        return None
+
+    # Only whether a resume exists: Airtable's attachment URLs are signed and
+    # expire, so the file itself is served by /api/resume/<record_id>
+    resume_pdf = fields.get("Resume_pdf") or []
+    has_resume = bool(resume_pdf and resume_pdf[0].get("url"))
+
+    # Get name and append (S) for student applications
+    applicant_name = fields.get("Applicant_Name", "")
+    source = fields.get("Source", "")
+    if source == "student_application":
+        applicant_name = f"{applicant_name} (S)"
+
+    return {
+        "id": record.get("id"),
+        "email": fields.get("Applicant_Email", ""),
+        "name": applicant_name,
+        "phone": fields.get("Applicant_Phone", ""),
+        "mba_college": fields.get("MBA_Institution_Name", "N/A"),
+        "has_mba": fields.get("Has_MBA", "No"),
+        "is_top_tier_mba": fields.get("is_Top-Tier", "No"),
+        "total_exp": fields.get("Total_Exp", ""),
+        "relevant_exp": fields.get("Relevant_Exp", ""),
+        "level": fields.get("Filt_Level", ""),
+        "video_link": video_link,
+        "has_resume": has_resume,
+        "stage_1_status": fields.get("Stage 1 Status", ""),
+        "source": source,
+        "ug_school": fields.get("Undergrad_School_Name", "N/A"),
+        "ug_top_tier": fields.get("UG_School_Top_Tier", "No"),
+        "reviewer_comments": fields.get("Reviewer Comments", ""),
+        # AI Evaluation fields
+        "ai_eval": fields.get("AI_Eval"),
+        "ai_mindset": fields.get("AI_Mindset"),
+        "ai_rec": ai_rec,
+        "ai_report_url": fields.get("AI_Report_URL", ""),
+        "ai_status": fields.get("AI_Status", ""),
+        "has_transcript": bool(fields.get("Video_link_transcript", "").strip()),
+    }
+
+
+def mba_category(row):
+    if row["is_top_tier_mba"] == "Yes":
+        return "top-tier"
+    if row["has_mba"] == "Yes":
+        return "other-mba"
+    return "no-mba"
+
+
+def stage_category(row):
+    """Stage 1 Status as the status filter matches it: blank counts as Not Reviewed,
+    any other value (e.g. On Hold) only matches itself"""
+    return row["stage_1_status"] or "Not Reviewed"
+
+
+class CandidateIndex:
+    """Video submitter rows with per-filter id sets and cached sort orders.
+
+    Rows keep the position they were first seen in, which (together with
+    the level) defines the default order and the S.No serial numbers.
+    Sort orders are rebuilt lazily after the rows change.
+    """
+
+    FILTERS = {
+        "level": lambda row: row["level"],
+        "mba": mba_category,
+        "ai_rec": lambda row: row["ai_rec"],
+        "status": stage_category,
+        "source": lambda row: row["source"],
+    }
+
+    def __init__(self):
+        self.rows = {}
+        self._seq = {}
+        self._search_keys = {}
+        self._postings = {name: {} for name in self.FILTERS}
+        self._orders = {}
+        self._serials = None
+
+    def __len__(self):
+        return len(self.rows)
+
+    def upsert(self, record):
+        """Add, update or drop a record depending on whether it is still listed"""
+        record_id = record["id"]
+        self.discard(record_id)
+        row = build_row(record)
+        if row is None:
+            return
+        self._seq.setdefault(record_id, len(self._seq))
+        self.rows[record_id] = row
+        self._search_keys[record_id] = f"{row['name']}\n{row['email']}".lower()
+        for name, key_fn in self.FILTERS.items():
+            self._postings[name].setdefault(key_fn(row), set()).add(record_id)
+        self._orders.clear()
+        self._serials = None
+
+    def discard(self, record_id):
+        row = self.rows.pop(record_id, None)
+        if row is None:
+            return
+        del self._search_keys[record_id]
+        for name, key_fn in self.FILTERS.items():
+            self._postings[name][key_fn(row)].discard(record_id)
+        self._orders.clear()
+        self._serials = None
+
+    def serial_number(self, record_id):
+        """1-based position in the default (level) order, as shown in the S.No column"""
+        if self._serials is None:
+            self._serials = {rid: i + 1 for i, rid in enumerate(self.order(None, None))}
+        return self._serials.get(record_id)
+
+    def order(self, column, direction):
+        """Record ids sorted by a column (None for the default level order)"""
+        key = (column, direction)
+        if key not in self._orders:
+            self._orders[key] = sorted(self.rows, key=self._sort_key(column, direction))
+        return self._orders[key]
+
+    def _sort_key(self, column, direction):
+        seq = self._seq
+        rows = self.rows
+        sign = 1 if direction == "asc" else -1
+
+        if column == "level":
+            def value(row):
+                match = LEVEL_NUMBER.search(row["level"] or "")
+                return int(match.group(1)) if match else None
+        elif column == "exp":
+            def value(row):
+                return _to_float(row["total_exp"]) or 0
+        elif column == "ai_eval":
+            def value(row):
+                return _to_float(row["ai_eval"]) if row["ai_eval"] is not None else None
+        elif column == "ai_rec":
+            def value(row):
+                return AI_REC_RANK.get(row["ai_rec"]) or None
+        else:
+            # Default order: Level 5 first, then 4, then 3, then the rest
+            return lambda rid: (LEVEL_ORDER.get(rows[rid]["level"], 99), seq[rid])
+
+        def key(rid):
+            v = value(rows[rid])
+            # Missing values always sort last, whatever the direction
+            return (1, 0, seq[rid]) if v is None else (0, sign * v, seq[rid])
+        return key
+
+    def query(self, name="", sort=None, direction="desc", offset=0, limit=None, **filters):
+        """Filter, sort and slice the rows.
+
+        filters: level, mba (top-tier / other-mba / no-mba), ai_rec,
+        status (Selected / Rejected / Not Reviewed or any other Stage 1
+        value; Not Reviewed includes blanks), source; empty values
+        are ignored.
+        Returns (matching rows for the slice, total number of matches).
+        """
+        allowed = None
+        for filter_name, value in filters.items():
+            if not value:
+                continue
+            ids = self._postings[filter_name].get(value, set())
+            allowed = ids if allowed is None else allowed & ids
+
+        if sort not in SORT_COLUMNS:
+            sort, direction = None, None
+        needle = name.lower().strip() if name else ""
+        search_keys = self._search_keys
+
+        matched = 0
+        page = []
+        stop = offset + limit if limit is not None else None
+        for rid in self.order(sort, direction):
+            if allowed is not None and rid not in allowed:
+                continue
+            if needle and needle not in search_keys[rid]:
+                continue
+            if matched >= offset and (stop is None or matched < stop):
+                page.append(rid)
+            matched += 1
+
+        return [dict(self.rows[rid], serial_number=self.serial_number(rid)) for rid in page], matched
+
+    def select(self, record_ids, name="", **filters):
+        """Rows (with serial numbers) for the ids that are still listed and match.
+
+        Takes the same filters as query(), checked row by row, so a caller
+        can walk an order() list in chunks without materialising the matches.
+        """
+        checks = [(self.FILTERS[filter_name], value) for filter_name, value in filters.items() if value]
+        needle = name.lower().strip() if name else ""
+        selected = []
+        for rid in record_ids:
+            row = self.rows.get(rid)
+            if row is None:
+                continue
+            if needle and needle not in self._search_keys[rid]:
+                continue
+            if all(key_fn(row) == value for key_fn, value in checks):
+                selected.append(dict(row, serial_number=self.serial_number(rid)))
+        return selected
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,244 @@
+"""
+Background job queue for AI evaluations
+Jobs live in SQLite so every gunicorn worker shares one queue, one
+concurrency limit and one view of which records are already being evaluated
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+
+from record_store import SQLiteStore
+
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    record_id TEXT NOT NULL,
+    options TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    run_after REAL NOT NULL,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    result TEXT,
+    error TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS jobs_active_record
+    ON jobs (record_id) WHERE status IN ('queued', 'running');
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, run_after);
+"""
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+JOB_COLUMNS = ("id", "record_id", "options", "status", "attempts", "run_after",
+               "created_at", "started_at", "finished_at", "result", "error")
+_SELECT = f"SELECT {', '.join(JOB_COLUMNS)} FROM jobs"
+
+
+class PermanentJobError(Exception):
+    """Raised by a job function for failures that retrying will not fix"""
+
+
+class JobQueue(SQLiteStore):
+    """Per-record jobs run by a small thread pool in every worker process.
+
+    At most one job per record is queued or running at a time (a unique
+    index enforces it across processes), and a job is only claimed while
+    fewer than `concurrency` jobs are running anywhere. Failed attempts are
+    retried with exponential backoff unless run_job raises
+    PermanentJobError; a job whose worker died is reclaimed after
+    `job_timeout` seconds.
+
+    run_job(record_id, **options) does the work and returns a
+    JSON-serializable result.
+    """
+
+    def __init__(self, path, run_job, concurrency=2, max_attempts=3, backoff=30,
+                 job_timeout=600, poll_interval=2.0, retention=7 * 24 * 60 * 60):
+        super().__init__(path, SCHEMA)
+        self.run_job = run_job
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.job_timeout = job_timeout
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self._wake = threading.Event()
+        self._threads = []
+        self._threads_lock = threading.Lock()
+        self._last_prune = 0
+
+    # ── Submitting and inspecting jobs ──
+
+    def submit(self, record_id, **options):
+        """Queue a job unless the record already has one queued or running.
+
+        Returns (job, created).
+        """
+        jobs, created = self.submit_many([record_id], **options)
+        return jobs[0], bool(created)
+
+    def submit_many(self, record_ids, **options):
+        """Queue jobs for several records in one transaction.
+
+        Returns (jobs, created_ids): one job per record id (new or already
+        active) and the ids of the jobs created by this call.
+        """
+        now = time.time()
+        job_ids, created_ids = [], []
+        with self._transaction() as conn:
+            for record_id in record_ids:
+                row = conn.execute(
+                    "SELECT id FROM jobs WHERE record_id = ? AND status IN (?, ?)",
+                    (record_id, QUEUED, RUNNING)
+                ).fetchone()
+                if row is None:
+                    cursor = conn.execute(
+                        "INSERT INTO jobs (record_id, options, status, run_after, created_at) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (record_id, json.dumps(options), QUEUED, now, now)
+                    )
+                    row = (cursor.lastrowid,)
+                    created_ids.append(row[0])
+                job_ids.append(row[0])
+        if created_ids:
+            self.start()
+            self._wake.set()
+        return [self.get(job_id) for job_id in job_ids], created_ids
+
+    def get(self, job_id):
+        """Job as a dict (with its queue position while queued), or None"""
+        conn = self._conn()
+        row = conn.execute(f"{_SELECT} WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = _job_from_row(row)
+        if job["status"] == QUEUED:
+            job["position"] = conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = ? AND (run_after < ? OR (run_after = ? AND id <= ?))",
+                (QUEUED, job["run_after"], job["run_after"], job_id)
+            ).fetchone()[0]
+        return job
+
+    def recent(self, limit=50, status=None):
+        """Most recently created jobs, optionally only those with one status"""
+        query, params = _SELECT, []
+        if status:
+            query += " WHERE status = ?"
+            params.append(status)
+        query += " ORDER BY id DESC LIMIT ?"
+        params.append(limit)
+        return [_job_from_row(row) for row in self._conn().execute(query, params).fetchall()]
+
+    def counts(self):
+        """Number of jobs per status"""
+        counts = {QUEUED: 0, RUNNING: 0, SUCCEEDED: 0, FAILED: 0}
+        rows = self._conn().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        counts.update(dict(rows))
+        return counts
+
+    # ── Running jobs ──
+
+    def start(self):
+        """Make sure this process has its pool of job threads running"""
+        with self._threads_lock:
+            # Threads do not survive a fork, so a forked worker starts its own
+            self._threads = [t for t in self._threads if t.is_alive()]
+            while len(self._threads) < self.concurrency:
+                thread = threading.Thread(target=self._run, name=f"jobs-{os.getpid()}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _run(self):
+        while True:
+            try:
+                job = self._claim()
+            except Exception:
+                logger.exception("Job queue error")
+                job = None
+            if job is None:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+                continue
+            self._execute(job)
+
+    def _claim(self):
+        """Mark the next due job as running, if the global limit allows one more"""
+        now = time.time()
+        with self._transaction() as conn:
+            # A job still running after job_timeout belongs to a dead worker
+            stale = now - self.job_timeout
+            conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, error = 'worker timed out' "
+                "WHERE status = ? AND started_at < ? AND attempts >= ?",
+                (FAILED, now, RUNNING, stale, self.max_attempts)
+            )
+            conn.execute(
+                "UPDATE jobs SET status = ?, run_after = ? WHERE status = ? AND started_at < ?",
+                (QUEUED, now, RUNNING, stale)
+            )
+            if now - self._last_prune > 60 * 60:
+                self._last_prune = now
+                conn.execute(
+                    "DELETE FROM jobs WHERE status IN (?, ?) AND finished_at < ?",
+                    (SUCCEEDED, FAILED, now - self.retention)
+                )
+
+            running = conn.execute("SELECT COUNT(*) FROM jobs WHERE status = ?", (RUNNING,)).fetchone()[0]
+            if running >= self.concurrency:
+                return None
+            row = conn.execute(
+                f"{_SELECT} WHERE status = ? AND run_after <= ? ORDER BY run_after, id LIMIT 1",
+                (QUEUED, now)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = ?, started_at = ?, attempts = attempts + 1 WHERE id = ?",
+                (RUNNING, now, row[0])
+            )
+        job = _job_from_row(row)
+        job["attempts"] += 1
+        return job
+
+    def _execute(self, job):
+        try:
+            result = self.run_job(job["record_id"], **job["options"])
+        except Exception as e:
+            now = time.time()
+            if isinstance(e, PermanentJobError) or job["attempts"] >= self.max_attempts:
+                self._finish(job["id"], FAILED, error=str(e))
+            else:
+                delay = self.backoff * 2 ** (job["attempts"] - 1)
+                with self._transaction() as conn:
+                    conn.execute(
+                        "UPDATE jobs SET status = ?, run_after = ?, error = ? WHERE id = ? AND status = ?",
+                        (QUEUED, now + delay, str(e), job["id"], RUNNING)
+                    )
+            return
+        self._finish(job["id"], SUCCEEDED, result=json.dumps(result))
+
+    def _finish(self, job_id, status, result=None, error=None):
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, result = ?, error = ? WHERE id = ? AND status = ?",
+                (status, time.time(), result, error, job_id, RUNNING)
+            )
+        # A slot just opened up for the other threads
+        self._wake.set()
+
+
+def _job_from_row(row):
+    job = dict(zip(JOB_COLUMNS, row))
+    job["options"] = json.loads(job["options"])
+    job["result"] = json.loads(job["result"]) if job["result"] else None
+    return job
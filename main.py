@@ -5,333 +5,1094 @@ Includes AI Video Evaluation features
 """
 
 import os
+import csv
+import gzip
+import json
+import math
+import re
 import requests
-from flask import Flask, render_template, jsonify, request
-from collections import Counter
+from flask import Flask, Response, abort, g, make_response, render_template, jsonify, request, send_file
 from dotenv import load_dotenv
 import time
+import threading
+from collections import OrderedDict
+from concurrent import futures
+from datetime import datetime, timedelta, timezone
+from functools import partial
+
+from airtable_client import AIRTABLE_API_URL, RATE_LIMIT, AirtableClient, SharedTokenBucket
+from candidate_index import SORT_COLUMNS, CandidateIndex
+from job_queue import JobQueue, PermanentJobError
+from metrics_history import PERIODS, MetricsHistory
+from record_cache import CACHE_TTL, REFRESH_WORKERS, RecordCacheRegistry
+from resume_cache import AttachmentExpired, ResumeCache
+from search_index import SEARCH_FIELDS
+import perf
 
 # Load environment variables
 load_dotenv()
 
 app = Flask(__name__)
+perf.init_app(app)
 
 # Airtable Configuration
 AIRTABLE_PAT = os.getenv("AIRTABLE_PAT")
 AIRTABLE_BASE_ID = os.getenv("AIRTABLE_BASE_ID")
 AIRTABLE_TABLE_ID = os.getenv("AIRTABLE_TABLE_ID")
 
-AIRTABLE_URL = f"https://api.airtable.com/v0/{AIRTABLE_BASE_ID}/{AIRTABLE_TABLE_ID}"
-HEADERS = {
-    "Authorization": f"Bearer {AIRTABLE_PAT}",
-    "Content-Type": "application/json"
-}
-
-# Hiring API URL for evaluation
+# Hiring API URL for evaluation (roles may set their own)
 HIRING_API_URL = os.getenv("HIRING_API_URL", "https://srv1079050.hstgr.cloud/hiring-api-la")
 
 
 # ──────────────────────────────────────────────────
-# In-memory cache for Airtable records (15-min TTL)
+# Roles: one record cache per Airtable table
 # ──────────────────────────────────────────────────
-_cache = {
-    "filtered_records": None,
-    "timestamp": 0
-}
-CACHE_TTL = 15 * 60  # 15 minutes
-
-
-def get_cached_data(force_refresh=False):
-    """Get filtered records with caching. Returns (filtered_records, cache_timestamp)."""
-    now = time.time()
-    if (not force_refresh
-            and _cache["filtered_records"] is not None
-            and (now - _cache["timestamp"]) < CACHE_TTL):
-        return _cache["filtered_records"], _cache["timestamp"]
-
-    records = fetch_all_records()
-    filtered = filter_test_entries(records)
-    _cache["filtered_records"] = filtered
-    _cache["timestamp"] = now
-    return filtered, now
-
-
-def invalidate_cache():
-    """Clear the cache so next read fetches fresh data."""
-    _cache["filtered_records"] = None
-    _cache["timestamp"] = 0
-
-
-def fetch_all_records():
-    """Fetch all records from Airtable with pagination"""
-    all_records = []
-    offset = None
-
-    while True:
-        params = {"pageSize": 100}
-        if offset:
-            params["offset"] = offset
-
-        response = requests.get(AIRTABLE_URL, headers=HEADERS, params=params)
-        data = response.json()
-
-        records = data.get("records", [])
-        all_records.extend(records)
-
-        offset = data.get("offset")
-        if not offset:
-            break
-
-    return all_records
-
-
-def filter_test_entries(records):
-    """Remove entries where email or source contains 'test'"""
-    filtered = []
-    for record in records:
-        fields = record.get("fields", {})
-        email = fields.get("Applicant_Email", "").lower()
-        source = fields.get("Source", "").lower()
-
-        if "test" not in email and "test" not in source:
-            filtered.append(record)
-
-    return filtered
-
-
-def calculate_metrics(records):
-    """Calculate all dashboard metrics from records"""
-    fields_list = [r.get("fields", {}) for r in records]
-
-    # Total Applications
-    total_applications = len(fields_list)
-
-    # Source Breakdown
-    sources = [f.get("Source", "Unknown") for f in fields_list]
-    source_breakdown = Counter(sources)
-    source_breakdown = dict(sorted(source_breakdown.items(), key=lambda x: x[1], reverse=True))
-
-    # Level Breakdown
-    levels = [f.get("Filt_Level", "Unknown") for f in fields_list]
-    level_breakdown = Counter(levels)
-    level_order = {"Level 5": 1, "Level 4": 2, "Level 3": 3, "Unknown": 4}
-    level_breakdown = dict(sorted(level_breakdown.items(), key=lambda x: level_order.get(x[0], 5)))
-
-    # Top-Tier MBA
-    top_tier_mba = []
-    mba_institutions = []
-    for f in fields_list:
-        if f.get("is_Top-Tier", "").lower() == "yes":
-            top_tier_mba.append(f)
-            inst = f.get("MBA_Institution_Name", "Unknown")
-            if inst and inst not in ["N/A", "Not specified", ""]:
-                mba_institutions.append(inst)
-
-    mba_institution_breakdown = Counter(mba_institutions)
-    mba_institution_breakdown = dict(sorted(mba_institution_breakdown.items(), key=lambda x: x[1], reverse=True))
-
-    # Top-Tier UG (only for those WITHOUT a Top-Tier MBA)
-    top_tier_ug = []
-    ug_institutions = []
-    for f in fields_list:
-        is_top_tier_ug = f.get("UG_School_Top_Tier", "").lower() == "yes"
-        is_top_tier_mba = f.get("is_Top-Tier", "").lower() == "yes"
-
-        if is_top_tier_ug and not is_top_tier_mba:
-            top_tier_ug.append(f)
-            inst = f.get("Undergrad_School_Name", "Unknown")
-            if inst and inst not in ["N/A", "Not specified", ""]:
-                ug_institutions.append(inst)
-
-    ug_institution_breakdown = Counter(ug_institutions)
-    ug_institution_breakdown = dict(sorted(ug_institution_breakdown.items(), key=lambda x: x[1], reverse=True))
-
-    # Section 2: Video Submissions
-    video_submissions = []
-    for f in fields_list:
-        video_link = f.get("Video_Link", "").strip()
-        if video_link:
-            video_submissions.append(f)
-
-    video_count = len(video_submissions)
-
-    # Video submissions by level
-    video_levels = [f.get("Filt_Level", "Unknown") for f in video_submissions]
-    video_level_breakdown = Counter(video_levels)
-    video_level_breakdown = dict(sorted(video_level_breakdown.items(), key=lambda x: level_order.get(x[0], 5)))
-
-    # Video submissions by MBA status
-    video_mba_breakdown = {"Top-Tier MBA": 0, "Other MBA": 0, "No MBA": 0}
-    video_mba_institutions = []
-    for f in video_submissions:
-        has_mba = f.get("Has_MBA", "").lower() == "yes"
-        is_top_tier = f.get("is_Top-Tier", "").lower() == "yes"
-
-        if is_top_tier:
-            video_mba_breakdown["Top-Tier MBA"] += 1
-            inst = f.get("MBA_Institution_Name", "Unknown")
-            if inst and inst not in ["N/A", "Not specified", ""]:
-                video_mba_institutions.append(inst)
-        elif has_mba:
-            video_mba_breakdown["Other MBA"] += 1
-        else:
-            video_mba_breakdown["No MBA"] += 1
-
-    video_mba_institution_breakdown = Counter(video_mba_institutions)
-    video_mba_institution_breakdown = dict(sorted(video_mba_institution_breakdown.items(), key=lambda x: x[1], reverse=True))
-
-    # Video submissions by Stage 1 Status
-    video_stage_breakdown = {"Selected": 0, "Rejected": 0, "Not Reviewed": 0}
-    for f in video_submissions:
-        stage = f.get("Stage 1 Status", "").strip()
-        if stage == "Selected":
-            video_stage_breakdown["Selected"] += 1
-        elif stage == "Rejected":
-            video_stage_breakdown["Rejected"] += 1
-        else:
-            video_stage_breakdown["Not Reviewed"] += 1
-
-    # AI Recommendation breakdown
-    ai_rec_breakdown = {"Strong Yes": 0, "Yes": 0, "Maybe": 0, "No": 0, "Not Evaluated": 0}
-    for f in video_submissions:
-        ai_rec = f.get("AI_Rec", "").strip()
-        if ai_rec in ai_rec_breakdown:
-            ai_rec_breakdown[ai_rec] += 1
+# One deployment serves several hiring pipelines ("roles"), each backed by
+# its own Airtable table. Roles are listed in the JSON file named by
+# ROLES_FILE; without it, a single role is built from AIRTABLE_BASE_ID /
+# AIRTABLE_TABLE_ID and keeps the original cache files. The first role is
+# the default, served at / and /api/...; every role is also served at
+# /r/<key>/ and /r/<key>/api/....
+#
+# Each role has its own record cache (record_cache.py): SQLite store shared
+# by all workers, TTL, memory budget, metrics history and evaluation queue.
+# Background refreshes of all roles run on one bounded thread pool, and
+# every role's Airtable client in every worker draws from one shared rate
+# limiter.
+CACHE_DB_PATH = os.getenv(
+    "CACHE_DB_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "records.db")
+)
+CACHE_DIR = os.path.dirname(CACHE_DB_PATH)
+HISTORY_DB_PATH = os.getenv("HISTORY_DB_PATH", os.path.join(CACHE_DIR, "history.db"))
+JOBS_DB_PATH = os.getenv("JOBS_DB_PATH", os.path.join(CACHE_DIR, "jobs.db"))
+ROLES_FILE = os.getenv("ROLES_FILE")
+ROLE_KEY = re.compile(r"[a-z0-9][a-z0-9_-]*")
+
+
+def load_roles():
+    """Role configs from ROLES_FILE, or the single role described by the environment.
+
+    Each role is a dict with key, name, base_id, table_id and optionally
+    ttl_minutes, memory_mb, unload_after_minutes, hiring_api_url and the
+    cache_db_path / history_db_path / jobs_db_path files (default:
+    cache/roles/<key>/).
+    """
+    if not ROLES_FILE:
+        return [{
+            "key": os.getenv("ROLE_KEY", "headofcustomersuccess"),
+            "name": os.getenv("ROLE_NAME", "Head of Customer Success"),
+            "base_id": AIRTABLE_BASE_ID,
+            "table_id": AIRTABLE_TABLE_ID,
+            "cache_db_path": CACHE_DB_PATH,
+            "history_db_path": HISTORY_DB_PATH,
+            "jobs_db_path": JOBS_DB_PATH,
+        }]
+
+    with open(ROLES_FILE) as f:
+        roles = json.load(f)
+    if not roles:
+        raise ValueError(f"{ROLES_FILE} lists no roles")
+    for role in roles:
+        key = role.get("key", "")
+        if not ROLE_KEY.fullmatch(key) or not role.get("base_id") or not role.get("table_id"):
+            raise ValueError(f"{ROLES_FILE}: every role needs a key (a-z, 0-9, - and _), base_id and table_id")
+        role_dir = os.path.join(CACHE_DIR, "roles", key)
+        role.setdefault("name", key)
+        role.setdefault("cache_db_path", os.path.join(role_dir, "records.db"))
+        role.setdefault("history_db_path", os.path.join(role_dir, "history.db"))
+        role.setdefault("jobs_db_path", os.path.join(role_dir, "jobs.db"))
+    return roles
+
+
+role_configs = load_roles()
+roles = {role["key"]: role for role in role_configs}
+if len(roles) != len(role_configs):
+    raise ValueError("Role keys must be unique")
+
+# Airtable allows 5 requests/second per base; one bucket for every table and
+# every gunicorn worker (a file in the cache directory) keeps the whole
+# deployment inside that even when all roles share a base
+airtable_limiter = SharedTokenBucket(os.path.join(CACHE_DIR, "airtable.ratelimit"), RATE_LIMIT)
+caches = RecordCacheRegistry(refresh_workers=int(os.getenv("REFRESH_WORKERS", str(REFRESH_WORKERS))))
+for role in roles.values():
+    caches.add(
+        role["key"],
+        role["name"],
+        AirtableClient(
+            role["base_id"],
+            role["table_id"],
+            AIRTABLE_PAT,
+            api_url=os.getenv("AIRTABLE_API_URL", AIRTABLE_API_URL),
+            limiter=airtable_limiter
+        ),
+        role["cache_db_path"],
+        history=MetricsHistory(role["history_db_path"]),
+        ttl=role.get("ttl_minutes", CACHE_TTL / 60) * 60,
+        memory_budget=role["memory_mb"] * 1024 * 1024 if role.get("memory_mb") else None,
+        unload_after=role["unload_after_minutes"] * 60 if role.get("unload_after_minutes") else None
+    )
+
+
+def role_route(rule, **options):
+    """Register a view at `rule` for the default role and at /r/<role>`rule` for every role"""
+    def decorator(view):
+        app.add_url_rule(rule, view_func=view, **options)
+        app.add_url_rule(f"/r/<role>{rule}", view_func=view, **options)
+        return view
+    return decorator
+
+
+@app.url_value_preprocessor
+def select_role(endpoint, values):
+    """Pick the record cache a request works on (g.cache) from its /r/<role> prefix"""
+    key = values.pop("role", None) if values else None
+    cache = caches.get(key if key is not None else caches.default.key)
+    if cache is None:
+        abort(make_response(jsonify({"error": f"Unknown role: {key}"}), 404))
+    g.cache = cache
+    g.role_prefixed = key is not None
+
+
+# ──────────────────────────────────────────────────
+# Snapshot responses
+# ──────────────────────────────────────────────────
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# Serialized API bodies, keyed by (path, query) and valid for one snapshot
+_responses = OrderedDict()
+_responses_lock = threading.Lock()
+RESPONSE_CACHE_SIZE = 256  # distinct path + query combinations kept per worker
+GZIP_MIN_SIZE = 1024  # smaller bodies are sent uncompressed
+
+
+def add_snapshot_headers(cache, response):
+    """Report the served snapshot's age and refresh state on an API response"""
+    timestamp = cache.state["timestamp"]
+    age = max(0, int(time.time() - timestamp)) if timestamp else None
+    response.headers["X-Snapshot-Age"] = str(age) if age is not None else ""
+    response.headers["X-Snapshot-Refreshing"] = "1" if cache.refresh_in_progress() else "0"
+    return response
+
+
+def snapshot_response(cache, build_payload):
+    """JSON response for the current snapshot with an ETag, 304 revalidation and gzip.
+
+    The body is serialized (and compressed) once per snapshot version and
+    query string; build_payload() only runs when that snapshot changed. The
+    ETag and the payload are taken under the same cache lock, so a refresh
+    landing in between cannot put a newer body under an older tag.
+    """
+    key = (request.path, tuple(sorted(
+        (k, v) for k, v in request.args.items(multi=True) if k != "refresh"
+    )))
+
+    payload = None
+    with cache.lock:
+        etag = f"v{cache.state['version']}-{int(cache.state['timestamp'])}"
+        with _responses_lock:
+            entry = _responses.get(key)
+            if entry is not None:
+                _responses.move_to_end(key)
+        if entry is None or entry["etag"] != etag:
+            with perf.stage("payload"):
+                payload = build_payload()
+    if payload is not None:
+        perf.incr("response_cache", result="miss")
+        with perf.stage("serialize"):
+            entry = {"etag": etag, "body": app.json.dumps(payload).encode(), "gzip": None}
+        with _responses_lock:
+            _responses[key] = entry
+            while len(_responses) > RESPONSE_CACHE_SIZE:
+                _responses.popitem(last=False)
+    else:
+        perf.incr("response_cache", result="hit")
+
+    if request.if_none_match.contains_weak(etag):
+        perf.incr("conditional_requests", result="not_modified")
+        response = app.response_class(status=304)
+    else:
+        body = entry["body"]
+        if len(body) >= GZIP_MIN_SIZE and "gzip" in request.accept_encodings:
+            if entry["gzip"] is None:
+                with perf.stage("gzip"):
+                    entry["gzip"] = gzip.compress(body, compresslevel=6)
+            body = entry["gzip"]
+            response = app.response_class(body, mimetype="application/json")
+            response.headers["Content-Encoding"] = "gzip"
         else:
-            ai_rec_breakdown["Not Evaluated"] += 1
-
-    # Transcript Processing breakdown (based on AI_Status)
-    # Exclude Stage 1 Rejected candidates from the count
-    transcript_processed = 0
-    transcript_not_processed = 0
-    for f in video_submissions:
-        stage1_status = f.get("Stage 1 Status", "").strip()
-        if stage1_status == "Rejected":
-            continue
-        ai_status = f.get("AI_Status", "").strip()
-        if ai_status == "Completed":
-            transcript_processed += 1
+            response = app.response_class(body, mimetype="application/json")
+
+    # Weak: the gzip and identity encodings share a tag
+    response.set_etag(etag, weak=True)
+    response.headers["Cache-Control"] = "no-cache"
+    response.vary.add("Accept-Encoding")
+    return add_snapshot_headers(cache, response)
+
+
+# ──────────────────────────────────────────────────
+# Metrics history
+# ──────────────────────────────────────────────────
+# Trends come from a local time series instead of re-crawling Airtable: a
+# compact metrics snapshot is appended after every refresh, and funnel
+# transitions (new application, video submitted, AI status, Stage 1
+# decision) are logged whenever a changed record is written to the store.
+# Daily and weekly rollups are maintained as they are written, so
+# /api/metrics/history is a handful of indexed reads. The first crawl only
+# sets the baseline; transitions are tracked from then on. Each role keeps
+# its own history file (see the Roles section).
+HISTORY_DEFAULT_DAYS = {"day": 30, "week": 26 * 7, "snapshot": 7}
+HISTORY_MAX_DAYS = 3 * 366
+HISTORY_LATEST = datetime(9999, 12, 24, tzinfo=timezone.utc).timestamp()  # leaves room for a week bucket
+
+
+def history_range(interval):
+    """(start, end) Unix timestamps from the from / to query parameters.
+
+    Each accepts a Unix timestamp or an ISO date or datetime (UTC); a bare
+    `to` date includes that whole day. Raises ValueError on bad input.
+    """
+    end = parse_history_time(request.args.get("to"), time.time(), end_of_day=True)
+    start = parse_history_time(request.args.get("from"), end - HISTORY_DEFAULT_DAYS[interval] * 86400)
+    if start < 0 or end > HISTORY_LATEST:
+        raise ValueError("from and to must lie between 1970 and 9999")
+    if start >= end:
+        raise ValueError("from must be before to")
+    if end - start > HISTORY_MAX_DAYS * 86400:
+        raise ValueError(f"range is limited to {HISTORY_MAX_DAYS} days")
+    return start, end
+
+
+def parse_history_time(value, default, end_of_day=False):
+    if not value:
+        return default
+    try:
+        timestamp = float(value)
+    except ValueError:
+        pass
+    else:
+        if not math.isfinite(timestamp):
+            raise ValueError(f"{value} is not a valid time")
+        return timestamp
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    if end_of_day and len(value) == 10:
+        try:
+            parsed += timedelta(days=1)
+        except OverflowError:
+            raise ValueError(f"{value} is not a valid time") from None
+    return parsed.timestamp()
+
+
+# ──────────────────────────────────────────────────
+# Candidate export
+# ──────────────────────────────────────────────────
+# /api/export streams the Section 3 list row by row. It walks the index's
+# sort order in chunks, holding the cache lock only while a chunk is read,
+# so memory stays flat and the first bytes go out before the list is done.
+EXPORT_FORMATS = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+EXPORT_COLUMNS = [
+    "serial_number", "name", "email", "phone", "level", "source", "mba_college", "has_mba",
+    "is_top_tier_mba", "ug_school", "ug_top_tier", "total_exp", "relevant_exp", "stage_1_status",
+    "ai_rec", "ai_eval", "ai_mindset", "ai_status", "ai_report_url", "has_transcript",
+    "video_link", "pdf_url", "reviewer_comments", "id",
+]
+EXPORT_CHUNK = 500  # rows read per lock acquisition
+# Spreadsheets run a cell starting with one of these as a formula
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+class _LineBuffer:
+    """File-like target that hands csv.writer's output straight back"""
+
+    def write(self, value):
+        return value
+
+
+def export_rows(cache, candidates, order, name, filters, columns, resume_url):
+    """Matching rows in `order`, reduced to `columns`, one chunk of the index at a time.
+
+    pdf_url is `resume_url` + record id for rows with a resume: Airtable's
+    attachment URLs expire within hours, /api/resume/<record_id> does not.
+    """
+    for i in range(0, len(order), EXPORT_CHUNK):
+        with cache.lock:
+            rows = candidates.select(order[i:i + EXPORT_CHUNK], name=name, **filters)
+        for row in rows:
+            row = dict(row, pdf_url=resume_url + row["id"] if row["has_resume"] else "")
+            yield [row[column] for column in columns]
+
+
+def csv_cell(value):
+    """A CSV value that spreadsheets show as text rather than evaluate as a formula"""
+    if value is None:
+        return ""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def export_lines(rows, columns, fmt):
+    """Serialize export rows as CSV (with a header line) or NDJSON"""
+    count = 0
+    try:
+        if fmt == "csv":
+            writer = csv.writer(_LineBuffer())
+            yield writer.writerow(columns)
+            for values in rows:
+                count += 1
+                yield writer.writerow([csv_cell(value) for value in values])
         else:
-            transcript_not_processed += 1
+            for values in rows:
+                count += 1
+                # json.dumps keeps the column order (app.json sorts keys)
+                yield json.dumps(dict(zip(columns, values)), ensure_ascii=False) + "\n"
+    finally:
+        perf.incr("exports", format=fmt)
+        perf.incr("export_rows", count, format=fmt)
 
+
+# ──────────────────────────────────────────────────
+# Resume cache
+# ──────────────────────────────────────────────────
+# /api/resume/<record_id> serves Resume_pdf from an on-disk LRU shared by all
+# workers (resume_cache.py), so each attachment is downloaded once and the
+# PDF viewer can use range requests. Airtable's attachment URLs expire; the
+# snapshot's URL is tried first and, if it has expired, the record is
+# re-read from Airtable and written through to the store. Attachment ids are
+# unique across bases, so every role shares one cache directory.
+RESUME_CACHE_DIR = os.getenv("RESUME_CACHE_DIR", os.path.join(CACHE_DIR, "resumes"))
+RESUME_CACHE_MB = int(os.getenv("RESUME_CACHE_MB", "500"))
+RESUME_MAX_AGE = 60 * 60  # browsers revalidate with the attachment id ETag after this
+RESUME_PREFETCH_DEFAULT = 10
+RESUME_PREFETCH_MAX = 50
+resume_cache = ResumeCache(RESUME_CACHE_DIR, RESUME_CACHE_MB * 1024 * 1024)
+
+
+def resume_attachment(fields):
+    """The first Resume_pdf attachment (id, url, filename, type), or None"""
+    attachments = fields.get("Resume_pdf") or []
+    if not attachments or not attachments[0].get("url"):
+        return None
+    attachment = attachments[0]
     return {
-        "total_applications": total_applications,
-        "source_breakdown": source_breakdown,
-        "level_breakdown": level_breakdown,
-        "top_tier_mba_count": len(top_tier_mba),
-        "mba_institutions": mba_institution_breakdown,
-        "top_tier_ug_count": len(top_tier_ug),
-        "ug_institutions": ug_institution_breakdown,
-        "video_count": video_count,
-        "video_level_breakdown": video_level_breakdown,
-        "video_mba_breakdown": video_mba_breakdown,
-        "video_mba_institutions": video_mba_institution_breakdown,
-        "video_stage_breakdown": video_stage_breakdown,
-        "ai_rec_breakdown": ai_rec_breakdown,
-        "transcript_processed": transcript_processed,
-        "transcript_not_processed": transcript_not_processed
+        "id": attachment.get("id") or attachment["url"],
+        "url": attachment["url"],
+        "filename": attachment.get("filename") or "resume.pdf",
+        "type": attachment.get("type") or "application/pdf",
     }
 
 
-@app.route("/")
+def refresh_resume_url(cache, record_id):
+    """Re-read a record for a fresh attachment URL and write it through to the cache"""
+    record = cache.airtable.get_record(record_id)
+    cache.apply_record_updates([record])
+    attachment = resume_attachment(record.get("fields", {}))
+    return attachment["url"] if attachment else None
+
+
+def fetch_resume(cache, record_id, attachment):
+    """Local path of a candidate's resume, downloading it on a cache miss"""
+    return resume_cache.fetch(attachment["id"], attachment["url"], lambda: refresh_resume_url(cache, record_id))
+
+
+# ──────────────────────────────────────────────────
+# Live updates: Server-Sent Events
+# ──────────────────────────────────────────────────
+# Every worker turns the store versions it loads into Section 3 row diffs
+# (kept in each role cache's state["changes"]). /api/events streams them to the browser with
+# the store version as the event id, so a reconnect resumes from
+# Last-Event-ID; a client this worker cannot catch up is told to resync.
+# While a stream is open, the snapshot is delta-synced every
+# LIVE_SYNC_INTERVAL so Airtable-side changes (AI results, new videos)
+# arrive within a minute.
+LIVE_SYNC_INTERVAL = 60
+EVENT_POLL_INTERVAL = 2  # seconds between checks of the store version
+EVENT_STREAM_DURATION = 5 * 60  # streams end after this; EventSource reconnects
+EVENT_KEEPALIVE = 15
+# Each open stream holds a gthread thread; past this many per worker,
+# /api/events answers 503 and the browser falls back to the countdown.
+# WORKER_THREADS must match gunicorn's --threads: the cap is clamped so
+# EVENT_THREAD_RESERVE threads are always left for regular requests.
+WORKER_THREADS = int(os.getenv("WORKER_THREADS", "8"))
+EVENT_THREAD_RESERVE = 2
+MAX_EVENT_STREAMS = int(os.getenv("MAX_EVENT_STREAMS", "4"))
+if MAX_EVENT_STREAMS > WORKER_THREADS - EVENT_THREAD_RESERVE:
+    app.logger.warning(
+        "MAX_EVENT_STREAMS=%d leaves fewer than %d of WORKER_THREADS=%d threads for requests; using %d",
+        MAX_EVENT_STREAMS, EVENT_THREAD_RESERVE, WORKER_THREADS, max(0, WORKER_THREADS - EVENT_THREAD_RESERVE)
+    )
+    MAX_EVENT_STREAMS = max(0, WORKER_THREADS - EVENT_THREAD_RESERVE)
+EVENT_ERROR_RETRY = 30  # seconds before a client retries a stream that failed to start
+_event_streams = 0
+_event_streams_lock = threading.Lock()
+SECTION2_METRICS = ("video_count", "video_level_breakdown", "video_mba_breakdown",
+                    "video_stage_breakdown", "transcript_processed", "transcript_not_processed")
+
+
+def sse_event(event, data, event_id=None):
+    lines = [f"id: {event_id}"] if event_id is not None else []
+    lines.append(f"event: {event}")
+    lines.append(f"data: {app.json.dumps(data)}")
+    return "\n".join(lines) + "\n\n"
+
+
+def section2_metrics(cache):
+    metrics = cache.get_metrics()
+    return {key: metrics[key] for key in SECTION2_METRICS}
+
+
+# ──────────────────────────────────────────────────
+# Reviewer edits: batched PATCHes + write-through
+# ──────────────────────────────────────────────────
+# Edits go through a coalescing queue that sends up to 10 records per PATCH
+# (Airtable's batch limit) and merges repeated edits to the same record. The
+# records Airtable returns are written straight into the shared store, so an
+# edit never forces a re-crawl. Each role's cache has its own queue
+# (RecordCache.write_queue).
+EDITABLE_FIELDS = {"Stage 1 Status", "Reviewer Comments"}
+WRITE_TIMEOUT = 30  # seconds a request waits for its queued edit to be sent
+MAX_BULK_UPDATES = 500  # records one /api/bulk-update request may queue
+WRITE_PENDING_MESSAGE = "Airtable has not confirmed the update yet; it is still queued and may apply later"
+
+
+class WriteTimeout(Exception):
+    """A queued edit was not confirmed within WRITE_TIMEOUT (it may still be sent)"""
+
+
+def queue_update(cache, record_id, fields):
+    """Queue a field update and wait for Airtable to confirm it. Returns the updated record."""
+    try:
+        return cache.write_queue.submit(record_id, fields).result(timeout=WRITE_TIMEOUT)
+    except futures.TimeoutError:
+        raise WriteTimeout(WRITE_PENDING_MESSAGE) from None
+
+
+def error_response(e):
+    """JSON error response, passing Airtable's own status code through when there is one"""
+    if isinstance(e, requests.HTTPError) and e.response is not None:
+        return jsonify({"error": e.response.text}), e.response.status_code
+    if isinstance(e, WriteTimeout):
+        return jsonify({"error": str(e)}), 504
+    return jsonify({"error": str(e)}), 500
+
+
+# ──────────────────────────────────────────────────
+# AI evaluations: background jobs
+# ──────────────────────────────────────────────────
+# An evaluation can take minutes, so it never runs inside a request: the
+# POST queues a job and returns its id, and a small thread pool in each
+# worker calls the Hiring API. The queue lives in its own SQLite file, which
+# caps concurrent Hiring API calls and deduplicates per record across all
+# workers. Each role has its own queue file and may use its own Hiring API.
+EVAL_CONCURRENCY = int(os.getenv("EVAL_CONCURRENCY", "2"))  # Hiring API calls at once, all workers
+EVAL_MAX_ATTEMPTS = 3
+EVAL_TIMEOUT = 180  # 3 minute timeout for evaluation with thinking
+AI_FIELDS = ["AI_Eval", "AI_Mindset", "AI_Rec", "AI_Report_URL", "AI_Status"]
+
+
+def run_evaluation(cache, hiring_api_url, record_id, force_rerun=False):
+    """Job body: evaluate one candidate through the Hiring API"""
+    if force_rerun:
+        # Clear existing AI fields first
+        queue_update(cache, record_id, {field: None for field in AI_FIELDS})
+
+    start = time.perf_counter()
+    try:
+        response = requests.post(
+            f"{hiring_api_url}/api/v1/evaluations/evaluate",
+            json={"record_id": record_id},
+            timeout=EVAL_TIMEOUT
+        )
+    except requests.RequestException as e:
+        perf.observe("evaluation_seconds", time.perf_counter() - start, outcome=type(e).__name__)
+        raise
+    perf.observe("evaluation_seconds", time.perf_counter() - start, outcome=str(response.status_code))
+
+    if response.status_code == 429 or response.status_code >= 500:
+        # Timeouts, connection errors and these are retried with backoff
+        raise RuntimeError(f"Hiring API returned {response.status_code}: {response.text}")
+    if response.status_code != 200:
+        raise PermanentJobError(f"Hiring API returned {response.status_code}: {response.text}")
+
+    cache.invalidate()
+    return response.json()
+
+
+eval_queues = {}
+for cache in caches:
+    role = roles[cache.key]
+    eval_queues[cache.key] = JobQueue(
+        role["jobs_db_path"],
+        partial(run_evaluation, cache, role.get("hiring_api_url", HIRING_API_URL)),
+        concurrency=role.get("eval_concurrency", EVAL_CONCURRENCY),
+        max_attempts=EVAL_MAX_ATTEMPTS,
+        job_timeout=EVAL_TIMEOUT + WRITE_TIMEOUT + 60
+    )
+    # Every worker drains the queue, including jobs left behind by a restart
+    eval_queues[cache.key].start()
+
+
+# ──────────────────────────────────────────────────
+# Instrumentation (perf.py)
+# ──────────────────────────────────────────────────
+# Routes are timed by perf.init_app(); hot-path stages (snapshot, metrics,
+# payload, serialize, gzip, render, airtable_crawl) show up in each
+# response's Server-Timing header. Figures are per worker process.
+# Per-table gauges carry a role label.
+
+
+def role_gauge(name, value):
+    perf.gauge(name, lambda: {(("role", cache.key),): value(cache) for cache in caches})
+
+
+role_gauge("snapshot_age_seconds",
+           lambda cache: round(time.time() - cache.state["timestamp"], 1) if cache.state["timestamp"] else 0)
+role_gauge("snapshot_version", lambda cache: cache.state["version"])
+role_gauge("snapshot_records", lambda cache: len(cache.state["records_by_id"]))
+role_gauge("snapshot_memory_bytes", lambda cache: cache.memory_estimate())
+role_gauge("candidates_listed", lambda cache: len(cache.state["candidates"]))
+role_gauge("refresh_in_progress", lambda cache: int(cache.refresh_in_progress()))
+perf.gauge("response_cache_entries", lambda: len(_responses))
+perf.gauge("event_streams", lambda: _event_streams)
+perf.gauge("resume_cache_bytes", lambda: resume_cache.stats()["bytes"])
+perf.gauge("evaluation_jobs", lambda: {
+    (("role", key), ("status", status)): count
+    for key, queue in eval_queues.items() for status, count in queue.counts().items()
+})
+
+
+def page_context(cache):
+    """Template variables shared by the HTML pages: the role shown and the role switcher"""
+    return {
+        "role": cache,
+        "roles": list(caches),
+        # Pages link with relative URLs; role pages sit two levels down (/r/<key>/)
+        "root": "../../" if g.role_prefixed else "",
+    }
+
+
+def needs_evaluation(fields):
+    """Video submitters with a transcript whose AI evaluation has not completed.
+
+    Candidates already rejected at Stage 1 are skipped, as in the Section 2
+    transcript counters.
+    """
+    return (
+        bool(fields.get("Video_Link", "").strip())
+        and bool(fields.get("Video_link_transcript", "").strip())
+        and fields.get("Stage 1 Status", "").strip() != "Rejected"
+        and fields.get("AI_Status", "").strip() != "Completed"
+    )
+
+
+@role_route("/")
 def dashboard():
     """Main dashboard page"""
+    cache = g.cache
     try:
         force = request.args.get('refresh') == '1'
-        filtered_records, cached_at = get_cached_data(force_refresh=force)
-        metrics = calculate_metrics(filtered_records)
-        return render_template("index.html", metrics=metrics, cached_at=cached_at)
+        _, cached_at = cache.get_cached_data(force_refresh=force)
+        metrics = cache.get_metrics()
+        with perf.stage("render"):
+            return render_template("index.html", metrics=metrics, cached_at=cached_at, **page_context(cache))
     except Exception as e:
-        return render_template("index.html", error=str(e), metrics=None)
+        return render_template("index.html", error=str(e), metrics=None, **page_context(cache))
 
 
-@app.route("/api/metrics")
+@role_route("/api/metrics")
 def api_metrics():
     """API endpoint for metrics"""
+    cache = g.cache
     try:
         force = request.args.get('refresh') == '1'
-        filtered_records, cached_at = get_cached_data(force_refresh=force)
-        metrics = calculate_metrics(filtered_records)
-        metrics["cached_at"] = cached_at
-        return jsonify(metrics)
+        _, cached_at = cache.get_cached_data(force_refresh=force)
+
+        def payload():
+            metrics = cache.get_metrics()
+            metrics["cached_at"] = cached_at
+            return metrics
+
+        return snapshot_response(cache, payload)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
-@app.route("/api/video-submitters")
+@role_route("/api/metrics/history")
+def api_metrics_history():
+    """Metric trends from the local history; never calls Airtable.
+
+    Query parameters (all optional):
+        interval  day / week (rollups, default day) or snapshot (raw snapshots)
+        from, to  Unix timestamp or ISO date / datetime in UTC
+                  (default: the last 30 days, 26 weeks or 7 days)
+        keys      comma-separated counters to return, e.g.
+                  video_count,stage.Not Reviewed or a group such as ai_rec.
+    """
+    cache = g.cache
+    interval = request.args.get("interval", "day")
+    if interval not in PERIODS and interval != "snapshot":
+        return jsonify({"error": "interval must be day, week or snapshot"}), 400
+    try:
+        start, end = history_range(interval)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    keys = [key for key in request.args.get("keys", "").split(",") if key]
+
+    with perf.stage("history"):
+        if interval == "snapshot":
+            limit = min(5000, max(1, request.args.get("limit", 1000, type=int) or 1000))
+            data = {"snapshots": cache.history.snapshots(start, end, keys=keys, limit=limit)}
+        else:
+            data = {"buckets": cache.history.rollups(interval, start, end, keys=keys)}
+    return jsonify(dict(data, interval=interval, **{"from": start, "to": end}))
+
+
+@role_route("/api/metrics/history/transitions")
+def api_metrics_transitions():
+    """Funnel transitions, newest first (from, to, record_id, field, limit)"""
+    cache = g.cache
+    try:
+        start, end = history_range("day")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    limit = min(5000, max(1, request.args.get("limit", 500, type=int) or 500))
+    return jsonify({
+        "transitions": cache.history.transitions(
+            start, end,
+            record_id=request.args.get("record_id"),
+            field=request.args.get("field"),
+            limit=limit
+        )
+    })
+
+
+@role_route("/api/video-submitters")
 def api_video_submitters():
-    """API endpoint for video submitters list with full details including AI evaluation"""
+    """API endpoint for the Section 3 candidate list: filtered, sorted and paged on the server.
+
+    Query parameters (all optional):
+        name      substring of name or email
+        level     Level 5 / Level 4 / Level 3
+        mba       top-tier / other-mba / no-mba
+        ai_rec    Strong Yes / Yes / Maybe / No
+        status    Selected / Rejected / Not Reviewed (blank) or another Stage 1 Status value
+        source    exact Source value, e.g. LinkedIn
+        sort      level / exp / ai_eval / ai_rec (default: level order)
+        direction asc / desc (default desc)
+        page      1-based page number (default 1)
+        limit     rows per page (default 50, max 500)
+
+    Rows are slim; full Airtable fields come from /api/candidates/<record_id>.
+    """
+    cache = g.cache
     try:
         force = request.args.get('refresh') == '1'
-        filtered_records, _ = get_cached_data(force_refresh=force)
-
-        video_submitters = []
-        for record in filtered_records:
-            fields = record.get("fields", {})
-            video_link = fields.get("Video_Link", "").strip()
-
-            if video_link:
-                # Skip candidates rejected after video evaluation
-                ai_rec = fields.get("AI_Rec", "").strip()
-                if ai_rec == "No":
-                    continue
-
-                resume_pdf = fields.get("Resume_pdf", [])
-                pdf_url = resume_pdf[0].get("url", "") if resume_pdf else ""
-
-                # Get name and append (S) for student applications
-                applicant_name = fields.get("Applicant_Name", "")
-                source = fields.get("Source", "")
-                if source == "student_application":
-                    applicant_name = f"{applicant_name} (S)"
-
-                submitter = {
-                    "id": record.get("id"),
-                    "email": fields.get("Applicant_Email", ""),
-                    "name": applicant_name,
-                    "phone": fields.get("Applicant_Phone", ""),
-                    "mba_college": fields.get("MBA_Institution_Name", "N/A"),
-                    "has_mba": fields.get("Has_MBA", "No"),
-                    "is_top_tier_mba": fields.get("is_Top-Tier", "No"),
-                    "total_exp": fields.get("Total_Exp", ""),
-                    "relevant_exp": fields.get("Relevant_Exp", ""),
-                    "level": fields.get("Filt_Level", ""),
-                    "video_link": video_link,
-                    "pdf_url": pdf_url,
-                    "stage_1_status": fields.get("Stage 1 Status", ""),
-                    "source": source,
-                    "ug_school": fields.get("Undergrad_School_Name", "N/A"),
-                    "ug_top_tier": fields.get("UG_School_Top_Tier", "No"),
-                    "has_relevant_exp": fields.get("Has_Relevant_Exp", ""),
-                    "technical_analytical": fields.get("Technical_Analytical", ""),
-                    "qualification_status": fields.get("Qualification_Status", ""),
-                    "comments": fields.get("Comments", ""),
-                    "referrer": fields.get("Referrer", ""),
-                    "analysis": fields.get("Analysis_explanation", ""),
-                    "reviewer_comments": fields.get("Reviewer Comments", ""),
-                    # AI Evaluation fields
-                    "ai_eval": fields.get("AI_Eval"),
-                    "ai_mindset": fields.get("AI_Mindset"),
-                    "ai_rec": fields.get("AI_Rec", ""),
-                    "ai_report_url": fields.get("AI_Report_URL", ""),
-                    "ai_status": fields.get("AI_Status", ""),
-                    "has_transcript": bool(fields.get("Video_link_transcript", "").strip()),
-                    "all_fields": fields
-                }
-                video_submitters.append(submitter)
-
-        # Sort by level (Level 5 first, then 4, then 3)
-        level_order = {"Level 5": 1, "Level 4": 2, "Level 3": 3}
-        video_submitters.sort(key=lambda x: level_order.get(x.get("level", ""), 99))
-
-        return jsonify(video_submitters)
+        _, cached_at = cache.get_cached_data(force_refresh=force)
+
+        args = request.args
+        page = max(1, args.get("page", 1, type=int) or 1)
+        limit = min(MAX_PAGE_SIZE, max(1, args.get("limit", DEFAULT_PAGE_SIZE, type=int) or DEFAULT_PAGE_SIZE))
+        direction = "asc" if args.get("direction") == "asc" else "desc"
+
+        def payload():
+            with cache.lock:
+                candidates = cache.state["candidates"]
+                rows, matched = candidates.query(
+                    name=args.get("name", ""),
+                    level=args.get("level", ""),
+                    mba=args.get("mba", ""),
+                    ai_rec=args.get("ai_rec", ""),
+                    status=args.get("status", ""),
+                    source=args.get("source", ""),
+                    sort=args.get("sort"),
+                    direction=direction,
+                    offset=(page - 1) * limit,
+                    limit=limit
+                )
+                total = len(candidates)
+            return {
+                "candidates": rows,
+                "total": total,
+                "matched": matched,
+                "page": page,
+                "limit": limit,
+                "pages": max(1, -(-matched // limit)),
+                "cached_at": cached_at
+            }
+
+        return snapshot_response(cache, payload)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@role_route("/api/search")
+def api_search():
+    """Full-text search over candidate profiles, analysis, comments and transcripts.
+
+    Query parameters:
+        q         words, "quoted phrases", prefix* (the last word is always a
+                  prefix) and field:term restrictions, all of which must match
+        fields    comma-separated subset of name / institution / analysis /
+                  comments / transcript to search (default: all)
+        page      1-based page number (default 1)
+        limit     results per page (default 20, max 100)
+
+    Results are ranked by BM25 and carry the matched fields and a snippet;
+    listed is true for candidates shown in Section 3.
+    """
+    cache = g.cache
+    args = request.args
+    query = args.get("q", "")
+    if not query.strip():
+        return jsonify({"error": "q is required"}), 400
+    fields = [field.strip() for field in args.get("fields", "").split(",") if field.strip()]
+    unknown = [field for field in fields if field not in SEARCH_FIELDS]
+    if unknown:
+        return jsonify({"error": f"Unknown fields: {', '.join(unknown)}"}), 400
+    page = max(1, args.get("page", 1, type=int) or 1)
+    limit = min(100, max(1, args.get("limit", 20, type=int) or 20))
+
+    try:
+        cache.get_cached_data()
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+    start = time.perf_counter()
+    with perf.stage("search"), cache.lock:
+        state = cache.state
+        if state["search"] is None:
+            return jsonify({"error": "Search is disabled for this role: its records exceed the memory budget"}), 503
+        results, total, exact = state["search"].search(query, fields=fields, limit=limit, offset=(page - 1) * limit)
+        candidates = state["candidates"]
+        for result in results:
+            record_fields = state["records_by_id"][result["id"]]["fields"]
+            result.update(
+                name=record_fields.get("Applicant_Name", ""),
+                email=record_fields.get("Applicant_Email", ""),
+                level=record_fields.get("Filt_Level", ""),
+                source=record_fields.get("Source", ""),
+                stage_1_status=record_fields.get("Stage 1 Status", ""),
+                ai_rec=record_fields.get("AI_Rec", ""),
+                listed=result["id"] in candidates.rows,
+                serial_number=candidates.serial_number(result["id"])
+            )
+    return jsonify({
+        "query": query,
+        "results": results,
+        "total": total,
+        "total_exact": exact,
+        "page": page,
+        "limit": limit,
+        "took_ms": round((time.perf_counter() - start) * 1000, 2)
+    })
+
+
+@role_route("/api/export")
+def api_export():
+    """Stream the Section 3 candidate list as CSV or NDJSON.
+
+    Query parameters (all optional):
+        format    csv (default) / ndjson
+        columns   comma-separated subset of EXPORT_COLUMNS, in output order
+        name, level, mba, ai_rec, status, source, sort, direction
+                  as for /api/video-submitters (no paging: every match is exported)
+    """
+    cache = g.cache
+    args = request.args
+    fmt = args.get("format", "csv")
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({"error": "format must be csv or ndjson"}), 400
+    columns = [column.strip() for column in args.get("columns", "").split(",") if column.strip()]
+    unknown = [column for column in columns if column not in EXPORT_COLUMNS]
+    if unknown:
+        return jsonify({"error": f"Unknown columns: {', '.join(unknown)}"}), 400
+
+    try:
+        cache.get_cached_data()
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+    filters = {key: args.get(key, "") for key in CandidateIndex.FILTERS}
+    direction = "asc" if args.get("direction") == "asc" else "desc"
+    sort = args.get("sort")
+    if sort not in SORT_COLUMNS:
+        sort, direction = None, None
+    with cache.lock:
+        # Order lists are rebuilt, never edited, when rows change: the stream
+        # walks a fixed order and reads each row as of its chunk
+        candidates = cache.state["candidates"]
+        order = candidates.order(sort, direction)
+
+    # Role-prefixed so the links keep pointing at this role if the default changes
+    resume_url = f"{request.url_root}r/{cache.key}/api/resume/"
+    rows = export_rows(cache, candidates, order, args.get("name", ""), filters, columns or EXPORT_COLUMNS,
+                       resume_url)
+    filename = time.strftime(f"candidates-%Y%m%d-%H%M.{fmt}", time.gmtime(cache.state["timestamp"] or time.time()))
+    response = Response(export_lines(rows, columns or EXPORT_COLUMNS, fmt), mimetype=EXPORT_FORMATS[fmt])
+    response.headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    response.headers["Cache-Control"] = "no-store"
+    response.headers["X-Accel-Buffering"] = "no"
+    return add_snapshot_headers(cache, response)
+
+
+@role_route("/api/candidates/<record_id>")
+def api_candidate_detail(record_id):
+    """All Airtable fields for one candidate (profile modal), fetched live.
+
+    The snapshot only keeps SNAPSHOT_FIELDS, so the full record comes
+    straight from Airtable.
+    """
+    cache = g.cache
+    try:
+        cache.get_cached_data()
+        if record_id not in cache.state["records_by_id"]:
+            return jsonify({"error": "Candidate not found"}), 404
+        record = cache.airtable.get_record(record_id)
+        return jsonify({"id": record_id, "fields": record.get("fields", {})})
+    except Exception as e:
+        return error_response(e)
+
+
+@role_route("/api/resume/<record_id>")
+def api_resume(record_id):
+    """A candidate's resume PDF from the local cache, with Range / ETag support"""
+    cache = g.cache
+    try:
+        cache.get_cached_data()
+        with cache.lock:
+            record = cache.state["records_by_id"].get(record_id)
+        if record is None:
+            return jsonify({"error": "Candidate not found"}), 404
+        attachment = resume_attachment(record["fields"])
+        if attachment is None:
+            return jsonify({"error": "No resume for this candidate"}), 404
+
+        for attempt in range(2):
+            path = fetch_resume(cache, record_id, attachment)
+            try:
+                response = send_file(path, mimetype=attachment["type"], download_name=attachment["filename"],
+                                     conditional=True, etag=attachment["id"], max_age=RESUME_MAX_AGE)
+                break
+            except FileNotFoundError:
+                # Evicted by another worker between fetch and open
+                if attempt:
+                    raise
+        # Resumes are personal data: keep them out of shared caches
+        response.cache_control.public = False
+        response.cache_control.private = True
+        return response
+    except AttachmentExpired:
+        return jsonify({"error": "Resume link has expired and could not be refreshed"}), 502
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 413
+    except Exception as e:
+        return error_response(e)
+
+
+@role_route("/api/resume/prefetch", methods=["POST"])
+def api_resume_prefetch():
+    """Download resumes for the top of a Section 3 page in the background.
+
+    Takes the /api/video-submitters query parameters (filters, sort, page,
+    limit) and prefetches the first `count` candidates of that page
+    (default 10, max 50). Returns 202 with how many downloads were queued.
+    """
+    cache = g.cache
+    args = request.args
+    count = min(RESUME_PREFETCH_MAX, max(1, args.get("count", RESUME_PREFETCH_DEFAULT, type=int)
+                                         or RESUME_PREFETCH_DEFAULT))
+    page = max(1, args.get("page", 1, type=int) or 1)
+    limit = min(MAX_PAGE_SIZE, max(1, args.get("limit", DEFAULT_PAGE_SIZE, type=int) or DEFAULT_PAGE_SIZE))
+    direction = "asc" if args.get("direction") == "asc" else "desc"
+    try:
+        cache.get_cached_data()
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+    with cache.lock:
+        rows, _ = cache.state["candidates"].query(
+            name=args.get("name", ""),
+            sort=args.get("sort"),
+            direction=direction,
+            offset=(page - 1) * limit,
+            limit=min(count, limit),
+            **{key: args.get(key, "") for key in CandidateIndex.FILTERS}
+        )
+        items = []
+        for row in rows:
+            attachment = resume_attachment(cache.state["records_by_id"][row["id"]]["fields"])
+            if attachment is not None:
+                items.append((attachment["id"], attachment["url"],
+                              lambda record_id=row["id"]: refresh_resume_url(cache, record_id)))
+    return jsonify({"queued": resume_cache.prefetch(items), "candidates": len(rows)}), 202
+
+
+@role_route("/api/events")
+def api_events():
+    """Server-Sent Events stream of Section 3 row changes and Section 2 counters.
+
+    Events:
+        ready    first event of a fresh stream: {version}
+        changes  {version, changes: [{id, type, fields, row}], total, metrics}
+                 type is added / updated (with the changed row fields) / removed
+        resync   the client missed changes and should reload its data
+        error    the snapshot could not be loaded: {error}; the stream ends
+
+    Answers 503 when this worker already serves MAX_EVENT_STREAMS streams.
+    """
+    global _event_streams
+    cache = g.cache
+    last_id = request.headers.get("Last-Event-ID", type=int)
+    with _event_streams_lock:
+        if _event_streams >= MAX_EVENT_STREAMS:
+            perf.incr("event_streams_rejected")
+            return jsonify({"error": "Too many live update streams; try again later"}), 503
+        _event_streams += 1
+    released = []
+
+    def release():
+        global _event_streams
+        with _event_streams_lock:
+            if not released:
+                released.append(True)
+                _event_streams -= 1
+
+    def stream():
+        try:
+            cache.get_cached_data()
+        except Exception as e:
+            app.logger.exception("Event stream could not load the snapshot for %s", cache.key)
+            yield f"retry: {EVENT_ERROR_RETRY * 1000}\n\n"
+            yield sse_event("error", {"error": str(e)})
+            return
+
+        version = last_id if last_id is not None else cache.state["version"]
+        yield "retry: 3000\n\n"
+        if last_id is None:
+            yield sse_event("ready", {"version": version}, version)
+
+        deadline = time.time() + EVENT_STREAM_DURATION
+        last_sent = time.time()
+        while time.time() < deadline:
+            cache.last_used = time.time()  # an open stream keeps the role loaded
+            meta = cache.store.meta()
+            if cache.is_stale(meta, time.time(), LIVE_SYNC_INTERVAL):
+                cache.schedule_refresh(max_age=LIVE_SYNC_INTERVAL)
+            cache.load_snapshot(meta)
+
+            batches, complete = cache.changes_after(version)
+            if batches or not complete:
+                if complete:
+                    for _, to_version, changes in batches:
+                        if changes:
+                            yield sse_event("changes", {
+                                "version": to_version,
+                                "changes": changes,
+                                "total": len(cache.state["candidates"]),
+                                "metrics": section2_metrics(cache)
+                            }, to_version)
+                        version = to_version
+                else:
+                    version = cache.state["version"]
+                    yield sse_event("resync", {"version": version}, version)
+                last_sent = time.time()
+            elif time.time() - last_sent >= EVENT_KEEPALIVE:
+                yield ": keepalive\n\n"
+                last_sent = time.time()
+            time.sleep(EVENT_POLL_INTERVAL)
+
+    response = Response(stream(), mimetype="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"  # keep nginx from buffering the stream
+    })
+    # The server closes the response even when the stream never started
+    response.call_on_close(release)
+    return response
+
+
+# ──────────────────────────────────────────────────
+# Cross-role summary
+# ──────────────────────────────────────────────────
+# /api/roles (and the /roles page) compares every pipeline from the cached
+# aggregates alone. Roles are brought up to date in parallel on the refresh
+# pool; one that is still on its first crawl after ROLES_WARM_TIMEOUT is
+# reported as loading rather than holding up the others.
+ROLES_WARM_TIMEOUT = 20
+SUMMARY_METRICS = ("total_applications", "top_tier_mba_count", "video_count", "transcript_processed",
+                   "transcript_not_processed", "level_breakdown", "video_stage_breakdown", "ai_rec_breakdown")
+
+
+def role_summary(cache, error=None):
+    """One role's headline numbers from its cached snapshot"""
+    state = cache.state
+    loaded = state["filtered_records"] is not None
+    timestamp = state["timestamp"]
+    metrics = cache.get_metrics() if loaded else {}
+    return {
+        "key": cache.key,
+        "name": cache.name,
+        "cached_at": timestamp or None,
+        "snapshot_age": max(0, int(time.time() - timestamp)) if timestamp else None,
+        "refreshing": cache.refresh_in_progress(),
+        "error": str(error) if error else None,
+        "candidates": len(state["candidates"]),
+        "metrics": {key: metrics[key] for key in SUMMARY_METRICS} if loaded else None,
+        "memory": {
+            "estimate_bytes": cache.memory_estimate(),
+            "budget_bytes": cache.memory_budget,
+            "search_enabled": state["search"] is not None,
+        },
+    }
+
 
-@app.route("/api/update-status", methods=["POST"])
+def sum_metrics(summaries):
+    """Counters and breakdowns added up across roles"""
+    totals = {}
+    for summary in summaries:
+        for key, value in (summary["metrics"] or {}).items():
+            if isinstance(value, dict):
+                breakdown = totals.setdefault(key, {})
+                for label, count in value.items():
+                    breakdown[label] = breakdown.get(label, 0) + count
+            else:
+                totals[key] = totals.get(key, 0) + value
+    return totals
+
+
+@app.route("/roles")
+def roles_page():
+    """Cross-role summary page"""
+    return render_template("roles.html", **page_context(g.cache))
+
+
+@app.route("/api/roles")
+def api_roles():
+    """Every role with its headline metrics, snapshot age and memory use, plus totals"""
+    with perf.stage("roles_warm"):
+        errors = caches.warm(timeout=ROLES_WARM_TIMEOUT)
+    summaries = [role_summary(cache, errors.get(cache.key)) for cache in caches]
+    return jsonify({
+        "roles": summaries,
+        "totals": dict(sum_metrics(summaries), candidates=sum(s["candidates"] for s in summaries)),
+        "default": caches.default.key
+    })
+
+
+@app.route("/api/debug/perf")
+def debug_perf():
+    """This worker's timings, counters and gauges (?format=prometheus for text exposition)"""
+    if request.args.get("format") == "prometheus":
+        return Response(perf.registry.prometheus(), mimetype="text/plain; version=0.0.4")
+    return jsonify(perf.registry.as_dict())
+
+
+@role_route("/api/update-status", methods=["POST"])
 def update_status():
     """Update Stage 1 Status in Airtable"""
+    cache = g.cache
     try:
         data = request.get_json()
         record_id = data.get("record_id")
@@ -340,28 +1101,17 @@ def update_status():
         if not record_id:
             return jsonify({"error": "record_id is required"}), 400
 
-        update_url = f"{AIRTABLE_URL}/{record_id}"
-        payload = {
-            "fields": {
-                "Stage 1 Status": new_status if new_status else None
-            }
-        }
-
-        response = requests.patch(update_url, headers=HEADERS, json=payload)
-
-        if response.status_code == 200:
-            invalidate_cache()
-            return jsonify({"success": True, "record": response.json()})
-        else:
-            return jsonify({"error": response.text}), response.status_code
+        record = queue_update(cache, record_id, {"Stage 1 Status": new_status if new_status else None})
+        return jsonify({"success": True, "record": record})
 
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return error_response(e)
 
 
-@app.route("/api/update-comments", methods=["POST"])
+@role_route("/api/update-comments", methods=["POST"])
 def update_comments():
     """Update Reviewer Comments in Airtable"""
+    cache = g.cache
     try:
         data = request.get_json()
         record_id = data.get("record_id")
@@ -370,28 +1120,62 @@ def update_comments():
         if not record_id:
             return jsonify({"error": "record_id is required"}), 400
 
-        update_url = f"{AIRTABLE_URL}/{record_id}"
-        payload = {
-            "fields": {
-                "Reviewer Comments": comments
-            }
-        }
+        record = queue_update(cache, record_id, {"Reviewer Comments": comments})
+        return jsonify({"success": True, "record": record})
 
-        response = requests.patch(update_url, headers=HEADERS, json=payload)
+    except Exception as e:
+        return error_response(e)
 
-        if response.status_code == 200:
-            invalidate_cache()
-            return jsonify({"success": True, "record": response.json()})
-        else:
-            return jsonify({"error": response.text}), response.status_code
+
+@role_route("/api/bulk-update", methods=["POST"])
+def bulk_update():
+    """Update reviewer fields on many records at once.
+
+    Body: {"updates": [{"record_id": "rec...", "fields": {"Stage 1 Status": "Selected"}}, ...]}
+    Only Stage 1 Status and Reviewer Comments may be set, on at most
+    MAX_BULK_UPDATES records. Updates are sent to Airtable in batches of 10
+    and applied to the cache as they are confirmed; the request waits
+    WRITE_TIMEOUT seconds in total and reports the rest as still queued.
+    """
+    cache = g.cache
+    try:
+        data = request.get_json(silent=True)
+        updates = data.get("updates") if isinstance(data, dict) else None
+        if not isinstance(updates, list):
+            return jsonify({"error": "updates must be a list"}), 400
+        if len(updates) > MAX_BULK_UPDATES:
+            return jsonify({"error": f"at most {MAX_BULK_UPDATES} updates per request"}), 400
+
+        for update in updates:
+            if not isinstance(update, dict) or not update.get("record_id"):
+                return jsonify({"error": "record_id is required"}), 400
+            fields = update.get("fields")
+            if not isinstance(fields, dict) or not fields or set(fields) - EDITABLE_FIELDS:
+                return jsonify({"error": f"fields must be a non-empty subset of {sorted(EDITABLE_FIELDS)}"}), 400
+
+        pending = [(u["record_id"], cache.write_queue.submit(u["record_id"], u["fields"])) for u in updates]
+        futures.wait([future for _, future in pending], timeout=WRITE_TIMEOUT)
+
+        records = []
+        failed = []
+        for record_id, future in pending:
+            if not future.done():
+                failed.append({"record_id": record_id, "error": WRITE_PENDING_MESSAGE, "pending": True})
+            elif future.exception() is not None:
+                failed.append({"record_id": record_id, "error": str(future.exception())})
+            else:
+                records.append(future.result())
+
+        return jsonify({"success": not failed, "records": records, "failed": failed})
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
-@app.route("/api/trigger-evaluation", methods=["POST"])
+@role_route("/api/trigger-evaluation", methods=["POST"])
 def trigger_evaluation():
-    """Trigger AI evaluation for a candidate via Hiring API"""
+    """Queue an AI evaluation for a candidate; poll /api/evaluations/<job_id> for the outcome"""
+    cache = g.cache
     try:
         data = request.get_json()
         record_id = data.get("record_id")
@@ -400,40 +1184,64 @@ def trigger_evaluation():
         if not record_id:
             return jsonify({"error": "record_id is required"}), 400
 
-        # If force_rerun, clear existing AI fields first
-        if force_rerun:
-            update_url = f"{AIRTABLE_URL}/{record_id}"
-            clear_payload = {
-                "fields": {
-                    "AI_Eval": None,
-                    "AI_Mindset": None,
-                    "AI_Rec": None,
-                    "AI_Report_URL": None,
-                    "AI_Status": None
-                }
-            }
-            requests.patch(update_url, headers=HEADERS, json=clear_payload)
+        job, created = eval_queues[cache.key].submit(record_id, force_rerun=bool(force_rerun))
+        return jsonify({
+            "success": True,
+            "queued": True,
+            "job_id": job["id"],
+            "status": job["status"],
+            "position": job.get("position", 0),
+            "duplicate": not created
+        }), 202
 
-        # Call the Hiring API evaluation endpoint
-        eval_url = f"{HIRING_API_URL}/api/v1/evaluations/evaluate"
-        response = requests.post(
-            eval_url,
-            json={"record_id": record_id},
-            timeout=180  # 3 minute timeout for evaluation with thinking
-        )
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
 
-        if response.status_code == 200:
-            invalidate_cache()
-            return jsonify(response.json())
-        else:
-            return jsonify({"error": response.text}), response.status_code
 
-    except requests.Timeout:
-        return jsonify({"error": "Evaluation timed out. Please try again."}), 504
+@role_route("/api/evaluations/bulk", methods=["POST"])
+def bulk_evaluation():
+    """Queue evaluations for every listed candidate whose AI_Status is not Completed (see needs_evaluation)"""
+    cache = g.cache
+    try:
+        filtered_records, _ = cache.get_cached_data()
+        record_ids = [r["id"] for r in filtered_records if needs_evaluation(r.get("fields", {}))]
+
+        jobs, created_ids = eval_queues[cache.key].submit_many(record_ids)
+        return jsonify({
+            "success": True,
+            "queued": len(created_ids),
+            "already_queued": len(jobs) - len(created_ids),
+            "job_ids": [job["id"] for job in jobs]
+        }), 202
+
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+@role_route("/api/evaluations")
+def list_evaluations():
+    """Evaluation queue summary: job counts per status and the most recent jobs"""
+    cache = g.cache
+    try:
+        limit = min(500, max(1, request.args.get("limit", 50, type=int) or 50))
+        return jsonify({
+            "counts": eval_queues[cache.key].counts(),
+            "concurrency": roles[cache.key].get("eval_concurrency", EVAL_CONCURRENCY),
+            "jobs": eval_queues[cache.key].recent(limit=limit, status=request.args.get("status"))
+        })
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@role_route("/api/evaluations/<int:job_id>")
+def evaluation_status(job_id):
+    """Status of one evaluation job: queued (with position), running, succeeded or failed"""
+    cache = g.cache
+    job = eval_queues[cache.key].get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job)
+
 
 if __name__ == "__main__":
     app.run(debug=True, host="0.0.0.0", port=5012)
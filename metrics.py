@@ -0,0 +1,256 @@
+"""
+Dashboard metrics engine
+Normalises each record once and keeps all breakdowns in a single aggregate
+that can be built in one pass and updated one record at a time
+"""
+
+import gc
+from collections import Counter, namedtuple
+from contextlib import contextmanager
+from itertools import compress
+
+
+LEVEL_ORDER = {"Level 5": 1, "Level 4": 2, "Level 3": 3, "Unknown": 4}
+AI_REC_VALUES = frozenset(("Strong Yes", "Yes", "Maybe", "No"))
+EXCLUDED_INSTITUTIONS = frozenset(("N/A", "Not specified", ""))
+
+# Airtable columns normalize_fields() reads
+METRICS_FIELDS = [
+    "Source", "Filt_Level", "is_Top-Tier", "MBA_Institution_Name", "UG_School_Top_Tier",
+    "Undergrad_School_Name", "Video_Link", "Has_MBA", "Stage 1 Status", "AI_Rec", "AI_Status",
+]
+
+# The only values calculate_metrics() needs from a record, already normalised
+MetricsRow = namedtuple("MetricsRow", [
+    "source",            # Source, "Unknown" if missing
+    "level",             # Filt_Level, "Unknown" if missing
+    "top_tier_mba",      # is_Top-Tier == yes
+    "mba_institution",   # counted MBA institution name, or None
+    "top_tier_ug",       # UG_School_Top_Tier == yes and not a top-tier MBA
+    "ug_institution",    # counted UG institution name, or None
+    "has_video",         # non-blank Video_Link
+    "has_mba",           # Has_MBA == yes
+    "stage",             # Selected / Rejected / Not Reviewed
+    "ai_rec",            # Strong Yes / Yes / Maybe / No / Not Evaluated
+    "ai_completed",      # AI_Status == Completed
+])
+_tuple_new = tuple.__new__  # builds a MetricsRow without namedtuple's Python-level __new__
+
+
+def normalize_fields(fields):
+    """Reduce an Airtable fields dict to the MetricsRow the aggregates are built from"""
+    get = fields.get
+    top_tier_mba = get("is_Top-Tier", "").lower() == "yes"
+    mba_institution = ug_institution = None
+    if top_tier_mba:
+        top_tier_ug = False
+        inst = get("MBA_Institution_Name", "Unknown")
+        if inst and inst not in EXCLUDED_INSTITUTIONS:
+            mba_institution = inst
+    else:
+        top_tier_ug = get("UG_School_Top_Tier", "").lower() == "yes"
+        if top_tier_ug:
+            inst = get("Undergrad_School_Name", "Unknown")
+            if inst and inst not in EXCLUDED_INSTITUTIONS:
+                ug_institution = inst
+
+    has_video = bool(get("Video_Link", "").strip())
+    if has_video:
+        stage = get("Stage 1 Status", "").strip()
+        if stage != "Selected" and stage != "Rejected":
+            stage = "Not Reviewed"
+        ai_rec = get("AI_Rec", "").strip()
+        if ai_rec not in AI_REC_VALUES:
+            ai_rec = "Not Evaluated"
+        ai_completed = get("AI_Status", "").strip() == "Completed"
+    else:
+        # Stage / AI values only feed the video breakdowns
+        stage, ai_rec, ai_completed = "Not Reviewed", "Not Evaluated", False
+
+    return _tuple_new(MetricsRow, (
+        get("Source", "Unknown"),
+        get("Filt_Level", "Unknown"),
+        top_tier_mba,
+        mba_institution,
+        top_tier_ug,
+        ug_institution,
+        has_video,
+        get("Has_MBA", "").lower() == "yes",
+        stage,
+        ai_rec,
+        ai_completed,
+    ))
+
+
+class MetricsAggregate:
+    """Running totals behind every dashboard breakdown.
+
+    add() and remove() adjust the totals for one normalised record, so a
+    changed record costs O(1) instead of a rescan of the whole table. The
+    initial rows are counted column by column with Counter, which is several
+    times faster than adding them one at a time.
+    """
+
+    def __init__(self, rows=()):
+        self.total = 0
+        self.sources = {}
+        self.levels = {}
+        self.top_tier_mba = 0
+        self.mba_institutions = {}
+        self.top_tier_ug = 0
+        self.ug_institutions = {}
+        self.video_count = 0
+        self.video_levels = {}
+        self.video_mba = {"Top-Tier MBA": 0, "Other MBA": 0, "No MBA": 0}
+        self.video_mba_institutions = {}
+        self.video_stages = {"Selected": 0, "Rejected": 0, "Not Reviewed": 0}
+        self.ai_recs = {"Strong Yes": 0, "Yes": 0, "Maybe": 0, "No": 0, "Not Evaluated": 0}
+        self.transcript_processed = 0
+        self.transcript_not_processed = 0
+        rows = rows if isinstance(rows, (list, tuple)) else list(rows)
+        if rows:
+            self._add_all(rows)
+
+    def _add_all(self, rows):
+        """Count a batch of rows into an empty aggregate (same totals as add() per row)"""
+        (sources, levels, top_tier_mba, mba_institutions, top_tier_ug, ug_institutions,
+         has_video, has_mba, stages, ai_recs, ai_completed) = zip(*rows)
+        self.total = len(rows)
+        self.sources = dict(Counter(sources))
+        self.levels = dict(Counter(levels))
+        self.top_tier_mba = sum(top_tier_mba)
+        self.mba_institutions = _counts(mba_institutions)
+        self.top_tier_ug = sum(top_tier_ug)
+        self.ug_institutions = _counts(ug_institutions)
+
+        # Section 2: video submissions
+        self.video_count = sum(has_video)
+        self.video_levels = dict(Counter(compress(levels, has_video)))
+        mba = Counter(compress(zip(top_tier_mba, has_mba), has_video))
+        self.video_mba["Top-Tier MBA"] = mba[True, True] + mba[True, False]
+        self.video_mba["Other MBA"] = mba[False, True]
+        self.video_mba["No MBA"] = mba[False, False]
+        self.video_mba_institutions = _counts(compress(mba_institutions, has_video))
+        for stage, count in Counter(compress(stages, has_video)).items():
+            self.video_stages[stage] += count
+        for ai_rec, count in Counter(compress(ai_recs, has_video)).items():
+            self.ai_recs[ai_rec] += count
+
+        # Transcript processing excludes Stage 1 Rejected candidates
+        for (stage, completed), count in Counter(compress(zip(stages, ai_completed), has_video)).items():
+            if stage == "Rejected":
+                continue
+            if completed:
+                self.transcript_processed += count
+            else:
+                self.transcript_not_processed += count
+
+    def add(self, row):
+        self._apply(row, 1)
+
+    def remove(self, row):
+        self._apply(row, -1)
+
+    def _apply(self, row, delta):
+        self.total += delta
+        _bump(self.sources, row.source, delta)
+        _bump(self.levels, row.level, delta)
+
+        if row.top_tier_mba:
+            self.top_tier_mba += delta
+            if row.mba_institution is not None:
+                _bump(self.mba_institutions, row.mba_institution, delta)
+        if row.top_tier_ug:
+            self.top_tier_ug += delta
+            if row.ug_institution is not None:
+                _bump(self.ug_institutions, row.ug_institution, delta)
+
+        if not row.has_video:
+            return
+
+        # Section 2: video submissions
+        self.video_count += delta
+        _bump(self.video_levels, row.level, delta)
+        if row.top_tier_mba:
+            self.video_mba["Top-Tier MBA"] += delta
+            if row.mba_institution is not None:
+                _bump(self.video_mba_institutions, row.mba_institution, delta)
+        elif row.has_mba:
+            self.video_mba["Other MBA"] += delta
+        else:
+            self.video_mba["No MBA"] += delta
+        self.video_stages[row.stage] += delta
+        self.ai_recs[row.ai_rec] += delta
+
+        # Transcript processing excludes Stage 1 Rejected candidates
+        if row.stage != "Rejected":
+            if row.ai_completed:
+                self.transcript_processed += delta
+            else:
+                self.transcript_not_processed += delta
+
+    def as_dict(self):
+        """Metrics in the shape the dashboard template and /api/metrics expect"""
+        return {
+            "total_applications": self.total,
+            "source_breakdown": _by_count(self.sources),
+            "level_breakdown": _by_level(self.levels),
+            "top_tier_mba_count": self.top_tier_mba,
+            "mba_institutions": _by_count(self.mba_institutions),
+            "top_tier_ug_count": self.top_tier_ug,
+            "ug_institutions": _by_count(self.ug_institutions),
+            "video_count": self.video_count,
+            "video_level_breakdown": _by_level(self.video_levels),
+            "video_mba_breakdown": dict(self.video_mba),
+            "video_mba_institutions": _by_count(self.video_mba_institutions),
+            "video_stage_breakdown": dict(self.video_stages),
+            "ai_rec_breakdown": dict(self.ai_recs),
+            "transcript_processed": self.transcript_processed,
+            "transcript_not_processed": self.transcript_not_processed
+        }
+
+
+def calculate_metrics(records):
+    """Calculate all dashboard metrics from records in a single pass"""
+    with gc_paused():
+        rows = [normalize_fields(r.get("fields", {})) for r in records]
+    return MetricsAggregate(rows).as_dict()
+
+
+@contextmanager
+def gc_paused():
+    """Hold off the cyclic garbage collector while building many small objects.
+
+    Normalising a table allocates one tuple per record and none of them form
+    cycles, but the allocations alone trigger repeated full collections.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _bump(counts, key, delta):
+    count = counts.get(key, 0) + delta
+    if count:
+        counts[key] = count
+    else:
+        counts.pop(key, None)
+
+
+def _counts(values):
+    """Counter of values without None, as a plain dict"""
+    counts = Counter(values)
+    counts.pop(None, None)
+    return dict(counts)
+
+
+def _by_count(counts):
+    return dict(sorted(counts.items(), key=lambda x: x[1], reverse=True))
+
+
+def _by_level(counts):
+    return dict(sorted(counts.items(), key=lambda x: LEVEL_ORDER.get(x[0], 5)))
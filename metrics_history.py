@@ -0,0 +1,269 @@
+"""
+Metrics history for the Hiring System Dashboard
+Append-only SQLite time series of compact metric snapshots and per-record
+funnel transitions, with daily and weekly rollups kept up to date on write
+"""
+
+import json
+import time
+from datetime import datetime, timedelta, timezone
+
+from record_store import SQLiteStore
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    taken_at REAL PRIMARY KEY,
+    version INTEGER NOT NULL,
+    metrics TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS transitions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    at REAL NOT NULL,
+    record_id TEXT NOT NULL,
+    field TEXT NOT NULL,
+    old_value TEXT,
+    new_value TEXT
+);
+CREATE INDEX IF NOT EXISTS transitions_at ON transitions (at);
+CREATE INDEX IF NOT EXISTS transitions_record ON transitions (record_id, field);
+CREATE TABLE IF NOT EXISTS rollups (
+    period TEXT NOT NULL,
+    start TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (period, start, kind, key)
+);
+"""
+
+PERIODS = ("day", "week")  # UTC days; weeks start on Monday
+
+# Funnel fields tracked per record, and their value before a record reaches that stage
+FUNNEL_FIELDS = {
+    "application": None,           # "Received" once the record exists
+    "video": None,                 # "Submitted" once Video_Link is filled in
+    "ai_status": "Not Started",    # AI_Status as written by the Hiring API
+    "stage": "Not Reviewed",       # Stage 1 Status: Selected / Rejected / Not Reviewed
+}
+
+
+def funnel_state(fields):
+    """The funnel values transitions are tracked for, from an Airtable fields dict"""
+    stage = fields.get("Stage 1 Status", "").strip()
+    return {
+        "application": "Received",
+        "video": "Submitted" if fields.get("Video_Link", "").strip() else None,
+        "ai_status": fields.get("AI_Status", "").strip() or "Not Started",
+        "stage": stage if stage in ("Selected", "Rejected") else "Not Reviewed",
+    }
+
+
+def compact_metrics(metrics):
+    """Flatten a calculate_metrics() dict to the counters worth keeping over time.
+
+    Institution breakdowns are left out; they are long and rarely trended.
+    """
+    compact = {
+        "total_applications": metrics["total_applications"],
+        "top_tier_mba_count": metrics["top_tier_mba_count"],
+        "top_tier_ug_count": metrics["top_tier_ug_count"],
+        "video_count": metrics["video_count"],
+        "transcript_processed": metrics["transcript_processed"],
+        "transcript_not_processed": metrics["transcript_not_processed"],
+    }
+    for prefix, key in (("source", "source_breakdown"), ("level", "level_breakdown"),
+                        ("video_level", "video_level_breakdown"), ("video_mba", "video_mba_breakdown"),
+                        ("stage", "video_stage_breakdown"), ("ai_rec", "ai_rec_breakdown")):
+        for name, count in metrics[key].items():
+            compact[f"{prefix}.{name}"] = count
+    return compact
+
+
+def bucket_start(timestamp, period):
+    """ISO date of the UTC day or week (Monday) containing a Unix timestamp"""
+    day = datetime.fromtimestamp(timestamp, timezone.utc).date()
+    if period == "week":
+        day -= timedelta(days=day.weekday())
+    return day.isoformat()
+
+
+class MetricsHistory(SQLiteStore):
+    """Snapshots, transitions and rollups shared by all worker processes.
+
+    Rollups are updated in the same transaction as the rows they summarise:
+    "events" counts transitions per field and new value ("stage.Selected"),
+    plus the summed time from video submission to a Stage 1 decision;
+    "closing" holds each counter's value in the last snapshot of the period.
+    Raw snapshots older than `retention` are pruned; rollups and transitions
+    are kept.
+    """
+
+    def __init__(self, path, retention=90 * 24 * 60 * 60):
+        super().__init__(path, SCHEMA)
+        self.retention = retention
+        self._last_prune = 0
+
+    # ── Recording ──
+
+    def add_snapshot(self, version, metrics, taken_at=None):
+        """Append a compact snapshot unless it matches the latest one. Returns True if stored."""
+        taken_at = taken_at or time.time()
+        compact = compact_metrics(metrics)
+        with self._transaction() as conn:
+            row = conn.execute("SELECT metrics FROM snapshots ORDER BY taken_at DESC LIMIT 1").fetchone()
+            if row is not None and json.loads(row[0]) == compact:
+                return False
+            conn.execute(
+                "INSERT OR REPLACE INTO snapshots (taken_at, version, metrics) VALUES (?, ?, ?)",
+                (taken_at, version, json.dumps(compact, sort_keys=True, separators=(",", ":")))
+            )
+            for period in PERIODS:
+                start = bucket_start(taken_at, period)
+                # Counters missing from this snapshot (e.g. a source that
+                # dropped to zero) must not keep their old closing value
+                conn.execute("DELETE FROM rollups WHERE period = ? AND start = ? AND kind = 'closing'",
+                             (period, start))
+                conn.executemany(
+                    "INSERT INTO rollups (period, start, kind, key, value) VALUES (?, ?, 'closing', ?, ?)",
+                    [(period, start, key, value) for key, value in compact.items()]
+                )
+            if taken_at - self._last_prune > 60 * 60:
+                self._last_prune = taken_at
+                conn.execute("DELETE FROM snapshots WHERE taken_at < ?", (taken_at - self.retention,))
+        return True
+
+    def add_transitions(self, changes, at=None):
+        """Record funnel transitions for changed records.
+
+        changes -- (record_id, old_fields or None, new_fields) for each
+                   record written; old_fields is None for a new record
+        Returns the number of transitions recorded.
+        """
+        at = at or time.time()
+        events = []
+        for record_id, old_fields, new_fields in changes:
+            old = funnel_state(old_fields) if old_fields is not None else FUNNEL_FIELDS
+            new = funnel_state(new_fields)
+            for field in FUNNEL_FIELDS:
+                if old[field] != new[field]:
+                    events.append((at, record_id, field, old[field], new[field]))
+        if not events:
+            return 0
+
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT INTO transitions (at, record_id, field, old_value, new_value) VALUES (?, ?, ?, ?, ?)",
+                events
+            )
+            counts = {}
+            for _, record_id, field, old_value, new_value in events:
+                keys = [f"{field}.{new_value}"]
+                if field == "stage" and old_value == "Not Reviewed":
+                    submitted = conn.execute(
+                        "SELECT MIN(at) FROM transitions WHERE record_id = ? AND field = 'video' "
+                        "AND new_value = 'Submitted' AND at < ?",
+                        (record_id, at)
+                    ).fetchone()[0]
+                    if submitted is not None:
+                        keys.append("review_seconds.count")
+                        counts["review_seconds.sum"] = counts.get("review_seconds.sum", 0) + (at - submitted)
+                for key in keys:
+                    counts[key] = counts.get(key, 0) + 1
+            conn.executemany(
+                "INSERT INTO rollups (period, start, kind, key, value) VALUES (?, ?, 'events', ?, ?) "
+                "ON CONFLICT (period, start, kind, key) DO UPDATE SET value = value + excluded.value",
+                [(period, bucket_start(at, period), key, value)
+                 for period in PERIODS for key, value in counts.items()]
+            )
+        return len(events)
+
+    # ── Queries ──
+
+    def snapshots(self, start, end, keys=None, limit=1000):
+        """Raw snapshots taken between two Unix timestamps, oldest first"""
+        rows = self._conn().execute(
+            "SELECT taken_at, version, metrics FROM snapshots WHERE taken_at >= ? AND taken_at < ? "
+            "ORDER BY taken_at LIMIT ?",
+            (start, end, limit)
+        ).fetchall()
+        return [
+            {"taken_at": taken_at, "version": version, "metrics": _select(json.loads(metrics), keys)}
+            for taken_at, version, metrics in rows
+        ]
+
+    def rollups(self, period, start, end, keys=None):
+        """One bucket per period between two Unix timestamps, gaps included.
+
+        Each bucket has the period's transition counts ("events"), the
+        counters at its close ("closing", carried forward through periods
+        without a snapshot) and the average hours from video submission to a
+        Stage 1 decision.
+        """
+        if period not in PERIODS:
+            raise ValueError(f"period must be one of {', '.join(PERIODS)}")
+        first, last = bucket_start(start, period), bucket_start(end, period)
+        conn = self._conn()
+        rows = conn.execute(
+            "SELECT start, kind, key, value FROM rollups WHERE period = ? AND start >= ? AND start <= ?",
+            (period, first, last)
+        ).fetchall()
+        data = {}
+        for bucket, kind, key, value in rows:
+            data.setdefault(bucket, {"events": {}, "closing": {}})[kind][key] = value
+
+        # Closing values carried into the first bucket from before the range
+        closing = {}
+        row = conn.execute(
+            "SELECT metrics FROM snapshots WHERE taken_at < ? ORDER BY taken_at DESC LIMIT 1",
+            (datetime.fromisoformat(first).replace(tzinfo=timezone.utc).timestamp(),)
+        ).fetchone()
+        if row is not None:
+            closing = json.loads(row[0])
+
+        buckets = []
+        step = timedelta(days=7 if period == "week" else 1)
+        day = datetime.fromisoformat(first).date()
+        while day.isoformat() <= last:
+            entry = data.get(day.isoformat(), {"events": {}, "closing": {}})
+            if entry["closing"]:
+                closing = entry["closing"]
+            events = entry["events"]
+            reviews = events.pop("review_seconds.count", 0)
+            review_seconds = events.pop("review_seconds.sum", 0)
+            buckets.append({
+                "start": day.isoformat(),
+                "events": {key: int(value) for key, value in sorted(events.items())},
+                "closing": _select({key: int(value) for key, value in closing.items()}, keys),
+                "avg_review_hours": round(review_seconds / reviews / 3600, 2) if reviews else None,
+            })
+            day += step
+        return buckets
+
+    def transitions(self, start, end, record_id=None, field=None, limit=500):
+        """Transitions between two Unix timestamps, newest first"""
+        query = ("SELECT at, record_id, field, old_value, new_value FROM transitions "
+                 "WHERE at >= ? AND at < ?")
+        params = [start, end]
+        if record_id:
+            query += " AND record_id = ?"
+            params.append(record_id)
+        if field:
+            query += " AND field = ?"
+            params.append(field)
+        query += " ORDER BY at DESC, id DESC LIMIT ?"
+        params.append(limit)
+        return [
+            {"at": at, "record_id": rid, "field": f, "old": old, "new": new}
+            for at, rid, f, old, new in self._conn().execute(query, params).fetchall()
+        ]
+
+
+def _select(values, keys):
+    """values limited to keys (exact names or "prefix." groups), or all of them"""
+    if not keys:
+        return values
+    return {
+        key: value for key, value in values.items()
+        if key in keys or any(key.startswith(k) for k in keys if k.endswith("."))
+    }
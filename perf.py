@@ -0,0 +1,240 @@
+"""
+Lightweight performance instrumentation for the Hiring System Dashboard
+Latency histograms per route and stage, counters and gauges, exposed as
+Server-Timing headers, JSON and Prometheus text
+
+Everything is kept in memory per worker process; recording a value is a dict
+lookup and a few additions under a lock, cheap enough to leave on.
+"""
+
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import g, has_request_context, request
+
+
+# Bucket upper bounds in seconds (roughly 1-2.5-5 steps from 1 ms to 1 min)
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+PREFIX = "dashboard_"
+
+
+class Histogram:
+    """Fixed-bucket latency histogram"""
+
+    __slots__ = ("counts", "count", "sum", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q):
+        """Estimate a quantile by interpolating inside its bucket"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = BUCKETS[i - 1] if i > 0 else 0.0
+                upper = BUCKETS[i] if i < len(BUCKETS) else self.max
+                return min(self.max, lower + (upper - lower) * (rank - seen) / bucket_count)
+            seen += bucket_count
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "mean": round(self.sum / self.count, 6) if self.count else None,
+            "max": round(self.max, 6),
+            "p50": _round(self.quantile(0.5)),
+            "p90": _round(self.quantile(0.9)),
+            "p99": _round(self.quantile(0.99)),
+        }
+
+
+class Registry:
+    """Histograms, counters, gauges and info dicts keyed by name and labels"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.histograms = {}  # (name, labels) -> Histogram
+        self.counters = {}    # (name, labels) -> number
+        self.gauges = {}      # name -> callable returning {labels: value} or a number
+        self.info = {}        # name -> dict (e.g. details of the last refresh)
+        self.started = time.time()
+
+    def observe(self, name, seconds, **labels):
+        key = (name, _labels(labels))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(seconds)
+
+    def incr(self, name, value=1, **labels):
+        key = (name, _labels(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def gauge(self, name, fn):
+        """Register a gauge read when the metrics are exported"""
+        self.gauges[name] = fn
+
+    def set_info(self, name, values):
+        with self._lock:
+            self.info[name] = dict(values)
+
+    def _gauge_values(self):
+        values = {}
+        for name, fn in self.gauges.items():
+            try:
+                value = fn()
+            except Exception:
+                continue
+            values[name] = value if isinstance(value, dict) else {(): value}
+        return values
+
+    def as_dict(self):
+        with self._lock:
+            histograms = {key: h.summary() for key, h in self.histograms.items()}
+            counters = dict(self.counters)
+            info = {name: dict(values) for name, values in self.info.items()}
+        return {
+            "pid": os.getpid(),
+            "uptime": round(time.time() - self.started, 1),
+            "histograms": _group(histograms),
+            "counters": _group(counters),
+            "gauges": _group({(name, labels): value
+                              for name, series in self._gauge_values().items()
+                              for labels, value in series.items()}),
+            "info": info,
+        }
+
+    def prometheus(self):
+        """All series in the Prometheus text exposition format (0.0.4)"""
+        lines = []
+        with self._lock:
+            histograms = sorted(
+                (key, list(h.counts), h.sum, h.count) for key, h in self.histograms.items()
+            )
+            counters = sorted(self.counters.items())
+
+        typed = set()
+        for (name, labels), counts, total, count in histograms:
+            metric = PREFIX + name
+            if metric not in typed:
+                lines.append(f"# TYPE {metric} histogram")
+                typed.add(metric)
+            cumulative = 0
+            for bound, bucket_count in zip(BUCKETS + ("+Inf",), counts):
+                cumulative += bucket_count
+                lines.append(f"{metric}_bucket{_prom_labels(labels + (('le', str(bound)),))} {cumulative}")
+            lines.append(f"{metric}_sum{_prom_labels(labels)} {total}")
+            lines.append(f"{metric}_count{_prom_labels(labels)} {count}")
+
+        for (name, labels), value in counters:
+            metric = f"{PREFIX}{name}_total"
+            if metric not in typed:
+                lines.append(f"# TYPE {metric} counter")
+                typed.add(metric)
+            lines.append(f"{metric}{_prom_labels(labels)} {value}")
+
+        for name, series in sorted(self._gauge_values().items()):
+            metric = PREFIX + name
+            lines.append(f"# TYPE {metric} gauge")
+            for labels, value in sorted(series.items()):
+                lines.append(f"{metric}{_prom_labels(labels)} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+observe = registry.observe
+incr = registry.incr
+gauge = registry.gauge
+set_info = registry.set_info
+
+
+@contextmanager
+def stage(name):
+    """Time a block as stage `name`.
+
+    Recorded in the stage_seconds histogram and, inside a request, added to
+    that response's Server-Timing header.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        registry.observe("stage_seconds", elapsed, stage=name)
+        if has_request_context():
+            stages = g.setdefault("perf_stages", [])
+            stages.append((name, elapsed))
+
+
+def init_app(app):
+    """Time every request per route and add Server-Timing headers"""
+
+    @app.before_request
+    def _start_timer():
+        g.perf_start = time.perf_counter()
+
+    @app.after_request
+    def _record_timing(response):
+        start = g.get("perf_start")
+        if start is None:
+            return response
+        elapsed = time.perf_counter() - start
+        route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+        registry.observe("request_seconds", elapsed, route=route, method=request.method)
+        registry.incr("requests", route=route, status=str(response.status_code))
+
+        timings = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in g.get("perf_stages", [])]
+        timings.append(f"app;dur={elapsed * 1000:.2f}")
+        response.headers["Server-Timing"] = ", ".join(timings)
+        return response
+
+
+def _labels(labels):
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _group(series):
+    """{(name, labels): value} -> {name: [{"labels": {...}, ...value}]}"""
+    grouped = {}
+    for (name, labels), value in sorted(series.items(), key=lambda item: item[0]):
+        entry = {"labels": dict(labels)}
+        if isinstance(value, dict):
+            entry.update(value)
+        else:
+            entry["value"] = value
+        grouped.setdefault(name, []).append(entry)
+    return grouped
+
+
+def _prom_labels(labels):
+    if not labels:
+        return ""
+    escaped = (
+        f'{key}="' + value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+        for key, value in labels
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+def _round(value):
+    return round(value, 6) if value is not None else None
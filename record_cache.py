@@ -0,0 +1,539 @@
+"""
+Per-table record caches for the Hiring System Dashboard
+Each hiring role's Airtable table gets its own shared SQLite store, in-memory
+snapshot, indexes and metrics history; a registry refreshes them in parallel
+on a bounded thread pool
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from candidate_index import ROW_FIELDS, CandidateIndex
+from metrics import METRICS_FIELDS, MetricsAggregate, gc_paused, normalize_fields
+from record_store import RecordStore, record_from_row
+from search_index import SEARCH_COLUMNS, SearchIndex
+from write_queue import CoalescingWriteQueue
+import perf
+
+
+logger = logging.getLogger(__name__)
+
+CACHE_TTL = 15 * 60  # 15 minutes
+RECONCILE_INTERVAL = 60 * 60  # 1 hour
+REFRESH_TIMEOUT = 10 * 60  # a refresh marker older than this is from a dead worker
+SYNC_OVERLAP = 60  # re-fetch the last minute each sync to absorb clock skew
+RECONCILE_FIELDS = ["Applicant_Email"]  # smallest projection that still lists every id
+# Columns the snapshot keeps: everything the metrics, Section 3 rows and the
+# search index read (which covers the test-entry filter and
+# needs_evaluation()). Other columns are never downloaded; the profile modal
+# fetches the full record.
+SNAPSHOT_FIELDS = sorted(set(METRICS_FIELDS) | set(ROW_FIELDS) | set(SEARCH_COLUMNS))
+EVENT_MAX_CHANGES = 500  # larger batches make the client resync instead
+REFRESH_WORKERS = 3  # tables refreshed from Airtable at once, per worker process
+
+# Resident memory per byte of stored fields JSON, measured with tracemalloc
+# on 5,000 benchmarks/synthetic.py records: the records, metrics rows and
+# Section 3 index (4.8x), and the search index on top (1.2x)
+SNAPSHOT_OVERHEAD = 5.0
+SEARCH_OVERHEAD = 1.2
+
+
+def is_test_entry(fields):
+    """True for entries where email or source contains 'test'"""
+    email = fields.get("Applicant_Email", "").lower()
+    source = fields.get("Source", "").lower()
+    return "test" in email or "test" in source
+
+
+def modified_since_formula(since):
+    """Airtable formula matching records created or modified after a Unix timestamp"""
+    stamp = time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime(since))
+    return (f"OR(IS_AFTER(LAST_MODIFIED_TIME(), DATETIME_PARSE('{stamp}')), "
+            f"IS_AFTER(CREATED_TIME(), DATETIME_PARSE('{stamp}')))")
+
+
+def diff_candidates(old_rows, candidates):
+    """Row-level changes between the old Section 3 rows and the index, or None if too many"""
+    changes = []
+    for record_id, old in old_rows.items():
+        new = candidates.rows.get(record_id)
+        if new is None:
+            if old is not None:
+                changes.append({"id": record_id, "type": "removed"})
+            continue
+        if old is None:
+            change = {"id": record_id, "type": "added"}
+        else:
+            fields = [key for key, value in new.items() if old.get(key) != value]
+            if not fields:
+                continue
+            change = {"id": record_id, "type": "updated", "fields": fields}
+        change["row"] = dict(new, serial_number=candidates.serial_number(record_id))
+        changes.append(change)
+    return changes if len(changes) <= EVENT_MAX_CHANGES else None
+
+
+class RecordCache:
+    """One Airtable table's records, shared by all workers through a SQLite store.
+
+    Only one worker at a time refreshes from Airtable (cross-process lock);
+    the others pick the changes up through the store's version counter.
+    Requests never wait for Airtable: a stale or invalidated snapshot is
+    served as-is while a background refresh runs (stale-while-revalidate).
+    The only blocking crawl is the very first one, when the store is empty.
+    After it, a refresh only asks for records modified since the last sync,
+    and an id-only sweep runs every RECONCILE_INTERVAL to drop deletions.
+
+    Each worker keeps an in-memory copy of the store (`state`, guarded by
+    `lock`). Records are normalised for the metrics engine once, when they
+    are loaded, and the aggregates and indexes are adjusted per changed
+    record. When the estimated size of the copy would exceed
+    `memory_budget` bytes the search index is dropped; with `unload_after`
+    set, a copy nobody has read for that many seconds is released and
+    reloaded from the store on the next request.
+    """
+
+    def __init__(self, key, name, airtable, store_path, history=None, ttl=CACHE_TTL,
+                 memory_budget=None, unload_after=None, refresh_pool=None):
+        self.key = key
+        self.name = name
+        self.airtable = airtable
+        self.store = RecordStore(store_path)
+        self.history = history
+        self.ttl = ttl
+        self.memory_budget = memory_budget
+        self.unload_after = unload_after
+        self.lock = threading.RLock()  # re-entrant: payload builders call get_metrics() under it
+        self.state = _empty_state()
+        self.last_used = time.time()
+        self.write_queue = CoalescingWriteQueue(self.airtable.update_records, on_flushed=self.apply_record_updates)
+        self._refresh_pool = refresh_pool
+        self._refresh = None  # Future (or Thread) of this worker's background refresh
+        self._refresh_lock = threading.Lock()
+
+    def __repr__(self):
+        return f"RecordCache({self.key!r})"
+
+    # ── Snapshot ──
+
+    def get_cached_data(self, force_refresh=False):
+        """Get filtered records with caching. Returns (filtered_records, cache_timestamp).
+
+        Serves the current snapshot immediately; if it is stale, dirty or a
+        refresh was forced, a background refresh is scheduled. The values
+        come from the state this call loaded, even if unload() swaps it out.
+        """
+        self.last_used = time.time()
+        meta = self.store.meta()
+        with perf.stage("snapshot"):
+            state = self.load_snapshot(meta)
+
+        if meta.get("synced_at") is None:
+            # Cold start: there is nothing to serve yet, so wait for the first crawl
+            with self.store.refresh_lock():
+                meta = self.store.meta()
+                if meta.get("synced_at") is None:
+                    with perf.stage("airtable_crawl"):
+                        self.sync_records(meta)
+                    meta = self.store.meta()
+            with perf.stage("snapshot_load"):
+                state = self.load_snapshot(meta)
+            self.record_snapshot()
+        elif force_refresh:
+            self.invalidate()
+        elif self.is_stale(meta, time.time()):
+            self.schedule_refresh()
+
+        return state["filtered_records"], state["timestamp"]
+
+    def is_stale(self, meta, now, max_age=None):
+        """True when the shared snapshot is missing, older than max_age (default: the
+        TTL), invalidated by a write or stored with a different column projection"""
+        synced_at = meta.get("synced_at")
+        if synced_at is None or meta.get("snapshot_fields") != SNAPSHOT_FIELDS:
+            return True
+        max_age = self.ttl if max_age is None else max_age
+        return (now - synced_at) >= max_age or meta.get("invalidated_at", 0) >= synced_at
+
+    def invalidate(self):
+        """Mark the shared cache stale (for every worker) and start a background refresh."""
+        self.store.set_meta(invalidated_at=time.time())
+        self.schedule_refresh()
+
+    def schedule_refresh(self, max_age=None):
+        """Queue a background refresh unless one is already queued or running in this worker.
+
+        The refresh only syncs if the snapshot is still stale (older than
+        max_age) once it holds the cross-process lock.
+        """
+        with self._refresh_lock:
+            if self._refresh is not None and not _finished(self._refresh):
+                return
+            if self._refresh_pool is not None:
+                self._refresh = self._refresh_pool.submit(self._background_refresh, max_age)
+            else:
+                self._refresh = threading.Thread(target=self._background_refresh, args=(max_age,),
+                                                 name=f"cache-refresh-{self.key}", daemon=True)
+                self._refresh.start()
+
+    def _background_refresh(self, max_age=None):
+        """Refresh the shared store if no other worker is already doing it."""
+        try:
+            with self.store.refresh_lock(blocking=False) as acquired:
+                if not acquired:
+                    return
+                meta = self.store.meta()
+                if not self.is_stale(meta, time.time(), max_age):
+                    return
+                self.store.set_meta(refresh_started_at=time.time())
+                try:
+                    self.sync_records(meta)
+                finally:
+                    self.store.set_meta(refresh_started_at=None)
+            self.load_snapshot(self.store.meta())
+            self.record_snapshot()
+        except Exception:
+            logger.exception("Background cache refresh failed for %s", self.key)
+
+    def refresh_in_progress(self):
+        """True while any worker is refreshing the shared store from Airtable"""
+        if self._refresh is not None and not _finished(self._refresh):
+            return True
+        started = self.store.meta().get("refresh_started_at")
+        return started is not None and (time.time() - started) < REFRESH_TIMEOUT
+
+    def load_snapshot(self, meta):
+        """Catch this worker's copy up with the shared store, reading only changed rows.
+
+        Returns the state it brought up to date.
+        """
+        with self.lock:
+            state = self.state
+            if meta["version"] == state["version"] and state["filtered_records"] is not None:
+                state["timestamp"] = max(state["timestamp"], meta.get("synced_at") or 0)
+                perf.incr("snapshot_loads", result="hit", role=self.key)
+                return state
+
+            previous = state["version"]
+            version, rows, full = self.store.changes_since(previous)
+            perf.incr("snapshot_loads", result="full" if full else "delta", role=self.key)
+            perf.incr("snapshot_rows_loaded", len(rows), role=self.key)
+            records_by_id = state["records_by_id"]
+            metrics_rows = state["metrics_rows"]
+            sizes = state["sizes"]
+            if full:
+                records_by_id.clear()
+                metrics_rows.clear()
+                sizes.clear()
+                state["bytes"] = 0
+                state["aggregate"] = MetricsAggregate()
+                state["candidates"] = CandidateIndex()
+                state["search"] = SearchIndex() if state["search"] is not None else None
+            aggregate = state["aggregate"]
+            candidates = state["candidates"]
+            search = state["search"]
+            old_rows = {}
+            indexed = []
+
+            # A full load allocates a row per record: hold the garbage collector
+            # off and count the aggregate in one batch at the end
+            with gc_paused() if full else nullcontext():
+                for row in rows:
+                    record_id, _, fields_json, deleted = row
+                    old_metrics_row = metrics_rows.pop(record_id, None)
+                    if old_metrics_row is not None:
+                        aggregate.remove(old_metrics_row)
+                    state["bytes"] -= sizes.pop(record_id, 0)
+
+                    old_rows[record_id] = candidates.rows.get(record_id)
+                    candidates.discard(record_id)
+
+                    if deleted:
+                        records_by_id.pop(record_id, None)
+                        if search is not None:
+                            search.remove(record_id)
+                        continue
+                    record = record_from_row(row)
+                    records_by_id[record_id] = record
+                    sizes[record_id] = len(fields_json)
+                    state["bytes"] += len(fields_json)
+                    if not is_test_entry(record["fields"]):
+                        metrics_row = normalize_fields(record["fields"])
+                        metrics_rows[record_id] = metrics_row
+                        if not full:
+                            aggregate.add(metrics_row)
+                        candidates.upsert(record)
+                        indexed.append(record)
+                    elif search is not None:
+                        search.remove(record_id)
+            if full:
+                state["aggregate"] = MetricsAggregate(list(metrics_rows.values()))
+
+            with perf.stage("search_index"):
+                if not self.search_fits():
+                    if search is not None:
+                        logger.warning("%s is over its memory budget; search is disabled", self.key)
+                    state["search"] = None
+                elif search is None:
+                    # Back under budget (or first load): index every listed record
+                    state["search"] = SearchIndex()
+                    state["search"].build([records_by_id[record_id] for record_id in metrics_rows])
+                else:
+                    search.build(indexed)
+
+            state["filtered_records"] = [r for r in records_by_id.values() if r["id"] in metrics_rows]
+            if full:
+                # Streams behind this point resync instead of replaying diffs
+                state["changes"].clear()
+            else:
+                state["changes"].append((previous, version, diff_candidates(old_rows, candidates)))
+            state["version"] = version
+            state["timestamp"] = max(state["timestamp"], meta.get("synced_at") or 0)
+            return state
+
+    def unload(self, idle_for=None):
+        """Release this worker's in-memory copy; the next request reloads it from the store.
+
+        With idle_for, the copy is only released if nobody has used it for
+        that many seconds and no background refresh is loading it; both are
+        checked under the refresh and state locks, so a request that has
+        just loaded the snapshot keeps it. Returns True if it was released.
+        """
+        with self._refresh_lock, self.lock:
+            if idle_for is not None:
+                refreshing = self._refresh is not None and not _finished(self._refresh)
+                if refreshing or time.time() - self.last_used <= idle_for:
+                    return False
+            self.state = _empty_state()
+        perf.incr("snapshot_unloads", role=self.key)
+        return True
+
+    # ── Memory ──
+
+    def memory_estimate(self):
+        """Approximate bytes held by this worker's copy of the table"""
+        overhead = SNAPSHOT_OVERHEAD + (SEARCH_OVERHEAD if self.state["search"] is not None else 0)
+        return int(self.state["bytes"] * overhead)
+
+    def search_fits(self):
+        """True if the snapshot and a search index fit the memory budget"""
+        if self.memory_budget is None:
+            return True
+        return self.state["bytes"] * (SNAPSHOT_OVERHEAD + SEARCH_OVERHEAD) <= self.memory_budget
+
+    # ── Airtable sync ──
+
+    def sync_records(self, meta):
+        """Refresh the shared store from Airtable. Caller must hold store.refresh_lock()."""
+        started = time.time()
+        with self.airtable.tally() as calls:
+            kind, fetched, deleted = self._sync_records(meta, started)
+        elapsed = time.time() - started
+
+        perf.observe("refresh_seconds", elapsed, kind=kind, role=self.key)
+        perf.incr("refreshes", kind=kind, role=self.key)
+        perf.set_info(f"last_refresh.{self.key}", {
+            "kind": kind,
+            "started_at": started,
+            "seconds": round(elapsed, 3),
+            "records_fetched": fetched,
+            "records_deleted": deleted,
+            "airtable": dict(calls, seconds=round(calls["seconds"], 3))
+        })
+
+    def _sync_records(self, meta, started):
+        """Fetch and store the changes; returns (kind, records fetched, records deleted)"""
+        last_sync = meta.get("last_sync")
+        update = {"last_sync": started, "synced_at": started, "snapshot_fields": SNAPSHOT_FIELDS}
+
+        if last_sync is None or meta.get("snapshot_fields") != SNAPSHOT_FIELDS:
+            # First sync, or the projection changed and every row needs re-fetching
+            update["last_reconcile"] = started
+            records = self.airtable.list_records(fields=SNAPSHOT_FIELDS)
+            if last_sync is not None:
+                self.record_transitions(records)
+            self.store.write(upserts=records, replace=True, meta=update)
+            return "full", len(records), 0
+
+        changed = self.airtable.list_records(
+            formula=modified_since_formula(last_sync - SYNC_OVERLAP),
+            fields=SNAPSHOT_FIELDS
+        )
+        deleted = []
+        if started - meta.get("last_reconcile", 0) >= RECONCILE_INTERVAL:
+            # Tombstones from the previous sweep have had an hour to reach every worker
+            self.store.prune_tombstones()
+            deleted = self.find_deleted_ids()
+            update["last_reconcile"] = started
+
+        self.record_transitions(changed)
+        self.store.write(upserts=changed, deletes=deleted, meta=update)
+        return ("reconcile" if "last_reconcile" in update else "delta"), len(changed), len(deleted)
+
+    def find_deleted_ids(self):
+        """Ids in the store that no longer exist in Airtable (delta syncs cannot see deletions)."""
+        live_ids = {r["id"] for r in self.airtable.list_records(fields=RECONCILE_FIELDS)}
+        return list(self.store.live_ids() - live_ids)
+
+    # ── Write-through ──
+
+    def apply_record_updates(self, records):
+        """Write updated Airtable records through to the shared store and this worker's copy.
+
+        The write queue calls this with every batch Airtable confirmed.
+        """
+        # PATCH responses carry every column; store only the snapshot's projection
+        records = [
+            dict(record, fields={k: v for k, v in record.get("fields", {}).items() if k in SNAPSHOT_FIELDS})
+            for record in records
+        ]
+        meta = None
+        if self.refresh_in_progress():
+            # A refresh running now may have fetched these records before the
+            # edit; make sure another one follows so it cannot win
+            meta = {"invalidated_at": time.time()}
+        self.record_transitions(records)
+        self.store.write(upserts=records, meta=meta)
+        self.load_snapshot(self.store.meta())
+
+    # ── Derived data ──
+
+    def get_metrics(self):
+        """Dashboard metrics for the current snapshot, computed at most once per version"""
+        with self.lock:
+            state = self.state
+            memo = state["metrics"]
+            if memo is None or memo[0] != state["version"]:
+                perf.incr("metrics_memo", result="miss")
+                with perf.stage("metrics"):
+                    memo = (state["version"], state["aggregate"].as_dict())
+                state["metrics"] = memo
+            else:
+                perf.incr("metrics_memo", result="hit")
+        return dict(memo[1])
+
+    def changes_after(self, version):
+        """Diff batches this worker loaded after `version`: (batches, complete).
+
+        complete is False when the log no longer reaches back to `version`.
+        """
+        with self.lock:
+            state = self.state
+            if version >= state["version"]:
+                return [], True
+            batches = [entry for entry in state["changes"] if entry[0] >= version]
+            complete = bool(batches) and batches[0][0] == version and all(
+                changes is not None for _, _, changes in batches
+            )
+            return batches, complete
+
+    # ── Metrics history ──
+
+    def record_snapshot(self):
+        """Append this worker's current metrics to the history (skipped if unchanged)"""
+        if self.history is None:
+            return
+        try:
+            self.history.add_snapshot(self.state["version"], self.get_metrics())
+        except Exception:
+            logger.exception("Recording metrics snapshot failed for %s", self.key)
+
+    def record_transitions(self, records):
+        """Log funnel transitions for records about to be written to the store"""
+        if self.history is None:
+            return
+        try:
+            old_fields = self.store.fields_for(r["id"] for r in records)
+            self.history.add_transitions(
+                (r["id"], old_fields.get(r["id"]), r.get("fields", {}))
+                for r in records if not is_test_entry(r.get("fields", {}))
+            )
+        except Exception:
+            logger.exception("Recording metric transitions failed for %s", self.key)
+
+
+class RecordCacheRegistry:
+    """The record caches of every role, in configuration order (the first is the default).
+
+    Background refreshes of all caches share one pool of `refresh_workers`
+    threads, so at most that many tables are crawled at once per worker;
+    rate limiting is left to the Airtable clients, which should share one
+    SharedTokenBucket.
+    """
+
+    def __init__(self, refresh_workers=REFRESH_WORKERS):
+        self.refresh_pool = ThreadPoolExecutor(refresh_workers, thread_name_prefix="cache-refresh")
+        self._caches = OrderedDict()
+        self._last_trim = 0
+
+    def add(self, key, name, airtable, store_path, **options):
+        """Create and register the cache for one role"""
+        if key in self._caches:
+            raise ValueError(f"Duplicate role key: {key}")
+        cache = RecordCache(key, name, airtable, store_path, refresh_pool=self.refresh_pool, **options)
+        self._caches[key] = cache
+        return cache
+
+    def get(self, key):
+        """The cache for a role key, or None; releases idle copies now and then"""
+        self.unload_idle()
+        return self._caches.get(key)
+
+    @property
+    def default(self):
+        return next(iter(self._caches.values()))
+
+    def __iter__(self):
+        return iter(self._caches.values())
+
+    def __len__(self):
+        return len(self._caches)
+
+    def warm(self, timeout=None):
+        """Bring every cache up to date in parallel on the refresh pool.
+
+        Cold tables are crawled concurrently (bounded by the pool); warm ones
+        only catch up with their store. Returns {role key: exception} for the
+        caches that failed.
+        """
+        futures = {self.refresh_pool.submit(cache.get_cached_data): cache for cache in self}
+        done, not_done = wait(futures, timeout=timeout)
+        errors = {futures[future].key: future.exception() for future in done if future.exception()}
+        errors.update({futures[future].key: TimeoutError("Cache is still loading") for future in not_done})
+        return errors
+
+    def unload_idle(self, now=None):
+        """Release the in-memory copies of caches idle longer than their unload_after"""
+        now = now or time.time()
+        if now - self._last_trim < 60:
+            return
+        self._last_trim = now
+        for cache in self:
+            if (cache.unload_after and cache.state["filtered_records"] is not None
+                    and now - cache.last_used > cache.unload_after):
+                cache.unload(idle_for=cache.unload_after)
+
+
+def _empty_state():
+    return {
+        "records_by_id": {},
+        "filtered_records": None,
+        "metrics_rows": {},              # record id -> MetricsRow (non-test records only)
+        "aggregate": MetricsAggregate(),
+        "metrics": None,                 # (version, metrics dict) memo
+        "candidates": CandidateIndex(),  # Section 3 rows, filter sets and sort orders
+        "search": SearchIndex(),         # full-text index for /api/search, None when over budget
+        "changes": deque(maxlen=256),    # (from_version, to_version, row diffs) for /api/events
+        "sizes": {},                     # record id -> bytes of stored fields JSON
+        "bytes": 0,
+        "version": 0,
+        "timestamp": 0
+    }
+
+
+def _finished(task):
+    return task.done() if hasattr(task, "done") else not task.is_alive()
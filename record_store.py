@@ -0,0 +1,237 @@
+"""
+Shared record store for the Hiring System Dashboard
+SQLite (WAL mode) snapshot of the Airtable table that every gunicorn worker reads
+"""
+
+import fcntl
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    id TEXT PRIMARY KEY,
+    created_time TEXT,
+    fields TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    deleted INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS records_version ON records (version);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+class SQLiteStore:
+    """SQLite file opened in WAL mode with one connection per thread and process"""
+
+    def __init__(self, path, schema):
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn().executescript(schema)
+
+    def _conn(self):
+        """Per-thread connection (re-opened after fork so workers never share one)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+
+class RecordStore(SQLiteStore):
+    """Versioned snapshot of Airtable records shared by all worker processes.
+
+    Every write bumps a global version counter and stamps the rows it touched
+    with it, so a worker holding version N only has to read rows with a
+    version above N to catch up. Deleted records are kept as tombstones until
+    the next prune so that catching up also sees deletions.
+    """
+
+    def __init__(self, path):
+        super().__init__(path, SCHEMA)
+        self.lock_path = path + ".lock"
+
+    # ── Metadata ──
+
+    def meta(self):
+        """All metadata values as a dict (includes the current 'version')"""
+        rows = self._conn().execute("SELECT key, value FROM meta").fetchall()
+        values = {key: json.loads(value) for key, value in rows}
+        values.setdefault("version", 0)
+        return values
+
+    def set_meta(self, **values):
+        with self._transaction() as conn:
+            self._set_meta(conn, values)
+
+    @staticmethod
+    def _set_meta(conn, values):
+        conn.executemany(
+            "INSERT INTO meta (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            [(key, json.dumps(value)) for key, value in values.items()]
+        )
+
+    # ── Records ──
+
+    def write(self, upserts=(), deletes=(), replace=False, meta=None):
+        """Apply record changes in one transaction and return the new version.
+
+        upserts  -- Airtable record dicts to insert or update
+        deletes  -- record ids to tombstone
+        replace  -- tombstone every live record not in upserts (full crawl)
+        meta     -- metadata to store alongside the change
+
+        Rows whose fields are unchanged are left alone; the version is only
+        bumped when something actually changed.
+        """
+        with self._transaction() as conn:
+            current = self._version(conn)
+            new_version = current + 1
+            before = conn.total_changes
+
+            conn.executemany(
+                "INSERT INTO records (id, created_time, fields, version, deleted) "
+                "VALUES (?, ?, ?, ?, 0) "
+                "ON CONFLICT(id) DO UPDATE SET fields = excluded.fields, "
+                "created_time = excluded.created_time, version = excluded.version, deleted = 0 "
+                "WHERE records.fields != excluded.fields OR records.deleted = 1",
+                [(r["id"], r.get("createdTime"), _dump_fields(r.get("fields", {})), new_version)
+                 for r in upserts]
+            )
+            if replace:
+                conn.execute("CREATE TEMP TABLE IF NOT EXISTS keep_ids (id TEXT PRIMARY KEY)")
+                conn.execute("DELETE FROM keep_ids")
+                conn.executemany("INSERT OR IGNORE INTO keep_ids (id) VALUES (?)",
+                                 [(r["id"],) for r in upserts])
+                conn.execute(
+                    "UPDATE records SET deleted = 1, version = ? "
+                    "WHERE deleted = 0 AND id NOT IN (SELECT id FROM keep_ids)",
+                    (new_version,)
+                )
+            conn.executemany(
+                "UPDATE records SET deleted = 1, version = ? WHERE id = ? AND deleted = 0",
+                [(new_version, record_id) for record_id in deletes]
+            )
+
+            changed = conn.total_changes != before
+            values = dict(meta or {})
+            if changed:
+                values["version"] = new_version
+            if values:
+                self._set_meta(conn, values)
+            return new_version if changed else current
+
+    def changes_since(self, version):
+        """Rows written after `version`.
+
+        Returns (current_version, rows, full) where rows are
+        (id, created_time, fields_json, deleted) tuples. When tombstones
+        older than `version` have been pruned, every live row is returned
+        and full is True so the caller rebuilds from scratch.
+        """
+        conn = self._conn()
+        conn.execute("BEGIN")
+        try:
+            meta = dict(conn.execute(
+                "SELECT key, value FROM meta WHERE key IN ('version', 'pruned_through')"
+            ).fetchall())
+            current = json.loads(meta.get("version", "0"))
+            pruned_through = json.loads(meta.get("pruned_through", "0"))
+            if current == version:
+                return current, [], False
+            if version == 0 or version < pruned_through or version > current:
+                rows = conn.execute(
+                    "SELECT id, created_time, fields, deleted FROM records "
+                    "WHERE deleted = 0 ORDER BY rowid"
+                ).fetchall()
+                return current, rows, True
+            rows = conn.execute(
+                "SELECT id, created_time, fields, deleted FROM records "
+                "WHERE version > ? ORDER BY rowid",
+                (version,)
+            ).fetchall()
+            return current, rows, False
+        finally:
+            conn.execute("COMMIT")
+
+    def fields_for(self, record_ids):
+        """Stored fields of the live records among record_ids, as {id: fields}"""
+        record_ids = list(record_ids)
+        conn = self._conn()
+        found = {}
+        for i in range(0, len(record_ids), 500):
+            chunk = record_ids[i:i + 500]
+            rows = conn.execute(
+                f"SELECT id, fields FROM records WHERE deleted = 0 AND id IN ({', '.join('?' * len(chunk))})",
+                chunk
+            ).fetchall()
+            found.update((record_id, json.loads(fields)) for record_id, fields in rows)
+        return found
+
+    def live_ids(self):
+        rows = self._conn().execute("SELECT id FROM records WHERE deleted = 0").fetchall()
+        return {row[0] for row in rows}
+
+    def prune_tombstones(self):
+        """Physically remove deleted rows; lagging readers fall back to a full reload"""
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM records WHERE deleted = 1")
+            self._set_meta(conn, {"pruned_through": self._version(conn)})
+
+    @staticmethod
+    def _version(conn):
+        row = conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        return json.loads(row[0]) if row else 0
+
+    # ── Cross-process refresh lock ──
+
+    @contextmanager
+    def refresh_lock(self, blocking=True):
+        """Exclusive lock held by whichever worker is refreshing from Airtable.
+
+        Yields True if the lock was acquired, False when blocking=False and
+        another worker already holds it.
+        """
+        with open(self.lock_path, "a") as lock_file:
+            flags = fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB
+            try:
+                fcntl.flock(lock_file, flags)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def record_from_row(row):
+    """Rebuild an Airtable-shaped record dict from a changes_since() row"""
+    record_id, created_time, fields_json, _ = row
+    return {"id": record_id, "createdTime": created_time, "fields": json.loads(fields_json)}
+
+
+def _dump_fields(fields):
+    return json.dumps(fields, sort_keys=True, separators=(",", ":"))
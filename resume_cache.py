@@ -0,0 +1,224 @@
+"""
+Resume cache for the Hiring System Dashboard
+Airtable attachments downloaded once into a size-bounded directory shared by
+every worker, evicted least recently used first
+"""
+
+import hashlib
+import os
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+import perf
+
+
+CHUNK_SIZE = 64 * 1024
+MAX_FILE_SIZE = 25 * 1024 * 1024  # larger attachments are refused, not cached
+EXPIRED_STATUSES = {400, 403, 404, 410}  # what an expired signed attachment URL answers
+TOUCH_INTERVAL = 60  # seconds before a hit bumps a file's recency again
+RESCAN_INTERVAL = 5 * 60  # other workers add files too; recount the directory this often
+EVICT_TO = 0.9  # evict down to this share of max_bytes so every add does not evict
+PART_MAX_AGE = 60 * 60  # leftover partial downloads older than this are removed
+SAFE_KEY = re.compile(r"[^A-Za-z0-9_-]")
+
+
+class AttachmentExpired(Exception):
+    """The attachment URL no longer works (Airtable's signed URLs expire)"""
+
+
+class ResumeCache:
+    """On-disk LRU of attachment files keyed by Airtable attachment id.
+
+    An attachment id always refers to the same file, so cached copies never
+    go stale; only the URL to download them does. Recency is each file's
+    mtime, bumped on hits, so all workers share one LRU order. Downloads go
+    to a temporary file and are renamed into place, so a reader never sees
+    a partial file.
+    """
+
+    def __init__(self, directory, max_bytes, timeout=(5, 60), prefetch_workers=2):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_file_size = min(MAX_FILE_SIZE, max_bytes)
+        self.timeout = timeout
+        os.makedirs(directory, exist_ok=True)
+
+        self.session = requests.Session()
+        self._locks = {}
+        self._locks_lock = threading.Lock()
+        self._size = None  # bytes on disk as of the last scan plus this worker's downloads
+        self._scanned_at = 0
+        self._evict_lock = threading.Lock()
+        self._prefetcher = ThreadPoolExecutor(prefetch_workers, thread_name_prefix="resume-prefetch")
+        self._pending = set()
+
+    def path(self, key):
+        """Where the file for `key` lives (whether or not it is cached yet)"""
+        safe = SAFE_KEY.sub("_", key)
+        if safe != key:
+            safe += "-" + hashlib.sha1(key.encode()).hexdigest()[:12]
+        return os.path.join(self.directory, safe)
+
+    def fetch(self, key, url, refresh=None):
+        """Path of the cached file for `key`, downloading `url` on a miss.
+
+        refresh -- optional callable returning a fresh URL; called once if
+                   `url` has expired
+        Raises AttachmentExpired, requests.RequestException or ValueError
+        (file too large) when the file cannot be downloaded.
+        """
+        path = self.path(key)
+        if self._touch(path):
+            perf.incr("resume_cache", result="hit")
+            return path
+        with self._lock_for(key):
+            try:
+                if self._touch(path):  # another thread finished downloading it
+                    perf.incr("resume_cache", result="hit")
+                    return path
+                perf.incr("resume_cache", result="miss")
+                try:
+                    size = self._download(url, path)
+                except AttachmentExpired:
+                    if refresh is None:
+                        raise
+                    perf.incr("resume_url_refreshes")
+                    url = refresh()
+                    if not url:
+                        raise
+                    size = self._download(url, path)
+            finally:
+                with self._locks_lock:
+                    self._locks.pop(key, None)
+        self._added(size)
+        return path
+
+    def prefetch(self, items):
+        """Download (key, url, refresh) items in the background; returns how many were queued"""
+        queued = 0
+        for key, url, refresh in items:
+            if key in self._pending or os.path.exists(self.path(key)):
+                continue
+            self._pending.add(key)
+            self._prefetcher.submit(self._prefetch_one, key, url, refresh)
+            queued += 1
+        return queued
+
+    def _prefetch_one(self, key, url, refresh):
+        try:
+            self.fetch(key, url, refresh)
+            perf.incr("resume_prefetches", result="ok")
+        except Exception:
+            # A resume that cannot be fetched now is retried when it is opened
+            perf.incr("resume_prefetches", result="error")
+        finally:
+            self._pending.discard(key)
+
+    def stats(self):
+        """Files and bytes currently in the cache directory"""
+        files, size = 0, 0
+        for entry in self._entries():
+            files += 1
+            size += entry[1]
+        return {"files": files, "bytes": size, "max_bytes": self.max_bytes}
+
+    # ── Internals ──
+
+    def _lock_for(self, key):
+        with self._locks_lock:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def _touch(self, path):
+        """True if `path` is cached, marking it recently used"""
+        try:
+            mtime = os.stat(path).st_mtime
+            if time.time() - mtime > TOUCH_INTERVAL:
+                os.utime(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def _download(self, url, path):
+        """Stream `url` into `path`; returns the file size"""
+        with perf.stage("resume_download"):
+            response = self.session.get(url, stream=True, timeout=self.timeout)
+            with response:
+                if response.status_code in EXPIRED_STATUSES:
+                    response.content  # drain the short error body so the connection is reused
+                    raise AttachmentExpired(f"Attachment URL answered {response.status_code}")
+                response.raise_for_status()
+                length = int(response.headers.get("Content-Length") or 0)
+                if length > self.max_file_size:
+                    raise ValueError(f"Attachment is larger than {self.max_file_size} bytes")
+
+                fd, part = tempfile.mkstemp(dir=self.directory, prefix=".part-")
+                size = 0
+                try:
+                    with os.fdopen(fd, "wb") as f:
+                        for chunk in response.iter_content(CHUNK_SIZE):
+                            size += len(chunk)
+                            if size > self.max_file_size:
+                                raise ValueError(f"Attachment is larger than {self.max_file_size} bytes")
+                            f.write(chunk)
+                    os.replace(part, path)
+                except BaseException:
+                    _unlink(part)
+                    raise
+        perf.incr("resume_download_bytes", size)
+        return size
+
+    def _added(self, size):
+        with self._evict_lock:
+            if self._size is not None:
+                self._size += size
+            if (self._size is None or self._size > self.max_bytes
+                    or time.time() - self._scanned_at > RESCAN_INTERVAL):
+                self._evict()
+
+    def _evict(self):
+        """Recount the directory and delete least recently used files over the budget"""
+        now = time.time()
+        entries = []
+        for path, size, mtime in self._entries(include_parts=True):
+            if os.path.basename(path).startswith(".part-"):
+                if now - mtime > PART_MAX_AGE:
+                    _unlink(path)
+                continue
+            entries.append((mtime, size, path))
+        total = sum(size for _, size, _ in entries)
+        if total > self.max_bytes:
+            entries.sort()
+            target = self.max_bytes * EVICT_TO
+            for _, size, path in entries:
+                if total <= target:
+                    break
+                _unlink(path)
+                total -= size
+                perf.incr("resume_evictions")
+        self._size = total
+        self._scanned_at = now
+
+    def _entries(self, include_parts=False):
+        """(path, size, mtime) for every file in the cache directory"""
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if not include_parts and entry.name.startswith(".part-"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue  # evicted by another worker mid-scan
+                if entry.is_file():
+                    yield entry.path, stat.st_size, stat.st_mtime
+
+
+def _unlink(path):
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,418 @@
+"""
+Full-text search index for the Hiring System Dashboard
+In-memory inverted index over candidate profiles, analysis, comments and
+video transcripts with BM25 ranking, prefix matching and field filters
+"""
+
+import bisect
+import heapq
+import math
+import re
+import unicodedata
+from array import array
+from collections import Counter, OrderedDict
+from operator import itemgetter
+
+
+# Searchable fields and the Airtable columns they cover
+SEARCH_FIELDS = {
+    "name": ["Applicant_Name", "Applicant_Email"],
+    "institution": ["MBA_Institution_Name", "Undergrad_School_Name"],
+    "analysis": ["Analysis_explanation"],
+    "comments": ["Comments", "Reviewer Comments"],
+    "transcript": ["Video_link_transcript"],
+}
+# A match in a short, specific field counts for more than one in a transcript
+FIELD_WEIGHTS = {"name": 3.0, "institution": 2.0, "analysis": 1.0, "comments": 1.5, "transcript": 0.6}
+
+# Airtable columns the index reads
+SEARCH_COLUMNS = sorted({column for columns in SEARCH_FIELDS.values() for column in columns})
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+MIN_PREFIX = 2            # shorter prefixes match too much to be useful
+MAX_EXPANSIONS = 20       # most frequent vocabulary terms a prefix expands to
+PHRASE_CHECK_LIMIT = 200  # ranked matches checked for a phrase before the total is estimated
+SNIPPET_RADIUS = 80       # characters of context either side of a match
+COMPACT_RATIO = 0.25      # rebuild once this share of documents is dead
+RESULT_CACHE_SIZE = 64    # ranked queries kept until the index changes
+
+STOPWORDS = frozenset("""
+a an and are as at be but by for from has have i in is it its of on or so that the their
+they this to was we were will with you your our not no he she his her him them me my
+""".split())
+TOKEN = re.compile(r"[a-z0-9]+")
+# field:"a phrase", field:term*, "a phrase", term*, term
+QUERY_CLAUSE = re.compile(r'(?:(\w+):)?(?:"([^"]*)"|(\S+))')
+
+
+def tokenize(text):
+    """Lowercased, accent-stripped word tokens (stopwords included)"""
+    if not isinstance(text, str):
+        text = " ".join(str(item) for item in text) if isinstance(text, list) else str(text)
+    text = text.lower()
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode()
+    return TOKEN.findall(text)
+
+
+def parse_query(query):
+    """Split a query into clauses: (field or None, terms, prefix, phrase).
+
+    Bare words are terms; a word ending in * is a prefix, and so is the
+    last word unless the query ends with a space (search as you type).
+    Quoted text is a phrase; field: restricts a clause to one of
+    SEARCH_FIELDS. Unknown field names are treated as plain text.
+    """
+    clauses = []
+    matches = list(QUERY_CLAUSE.finditer(query))
+    for i, match in enumerate(matches):
+        field, phrase, word = match.groups()
+        if field and field not in SEARCH_FIELDS:
+            word = f"{field}:{phrase if phrase is not None else word}"
+            field, phrase = None, None
+        if phrase is not None:
+            terms = tokenize(phrase)
+            if len(terms) > 1:
+                clauses.append((field, terms, False, True))
+            elif terms and terms[0] not in STOPWORDS:
+                clauses.append((field, terms, False, False))
+            continue
+        prefix = word.endswith("*") or (i == len(matches) - 1 and not query.endswith(" "))
+        tokens = tokenize(word)
+        for j, term in enumerate(tokens):
+            is_prefix = prefix and j == len(tokens) - 1 and len(term) >= MIN_PREFIX
+            if term in STOPWORDS and not is_prefix:
+                continue
+            clauses.append((field, [term], is_prefix, False))
+    return clauses
+
+
+class SearchIndex:
+    """Inverted index with one posting list per field and term.
+
+    Documents get a sequential number. A posting list is a pair of arrays:
+    document numbers and the BM25 term-frequency component for that
+    document, computed when it is indexed (against the field's average
+    length at that time, or the final average for a bulk build). Queries
+    only multiply by the term's current idf and field weight, so scoring a
+    posting list is a C-level dict build.
+
+    A changed or removed record leaves a dead document that queries drop;
+    the index is rebuilt once dead documents pass COMPACT_RATIO. Stored
+    fields dicts are kept by reference (the snapshot already holds them)
+    for phrase checks and snippets.
+    """
+
+    def __init__(self):
+        self._reset()
+
+    def _reset(self):
+        self._postings = {field: {} for field in SEARCH_FIELDS}  # field -> term -> (docs, impacts)
+        self._total_length = dict.fromkeys(SEARCH_FIELDS, 0)
+        self._record_ids = []   # doc -> record id (None once dead)
+        self._fields = []       # doc -> Airtable fields dict (None once dead)
+        self._lengths = []      # doc -> {field: tokens}
+        self._docs = {}         # record id -> live doc
+        self._dead = set()
+        self._terms = []        # sorted vocabulary, for prefix lookups
+        self._term_set = set()
+        self._pending_terms = set()
+        self._results = OrderedDict()
+
+    def __len__(self):
+        return len(self._docs)
+
+    # ── Updates ──
+
+    def build(self, records):
+        """Index many records at once, normalising lengths against the final averages"""
+        analysed = []
+        for record in records:
+            self._remove(record["id"])
+            fields = record.get("fields", {})
+            analysed.append((record["id"], fields, _analyse(fields)))
+        for _, _, analysis in analysed:
+            for field, (length, _) in analysis.items():
+                self._total_length[field] += length
+        live = len(self._docs) + len(analysed)
+        for record_id, fields, analysis in analysed:
+            self._append(record_id, fields, analysis, live=live)
+        self._changed()
+
+    def add(self, record_id, fields):
+        """Index (or re-index) a record's searchable fields"""
+        self._remove(record_id)
+        self._append(record_id, fields, _analyse(fields))
+        self._changed()
+
+    def remove(self, record_id):
+        if self._remove(record_id):
+            self._changed()
+
+    def _append(self, record_id, fields, analysis, live=None):
+        """Add a document; `live` is the final document count of a bulk build,
+        whose lengths are already in the totals"""
+        doc = len(self._record_ids)
+        self._record_ids.append(record_id)
+        self._fields.append(fields)
+        self._docs[record_id] = doc
+        lengths = {}
+        for field, (length, counts) in analysis.items():
+            lengths[field] = length
+            if live is None:
+                self._total_length[field] += length
+            if not counts:
+                continue
+            average = self._total_length[field] / (live or len(self._docs)) or 1
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * length / average)
+            postings = self._postings[field]
+            for term, tf in counts.items():
+                entry = postings.get(term)
+                if entry is None:
+                    entry = postings[term] = (array("I"), array("f"))
+                    if term not in self._term_set:
+                        self._term_set.add(term)
+                        self._pending_terms.add(term)
+                entry[0].append(doc)
+                entry[1].append(tf * (BM25_K1 + 1) / (tf + norm))
+        self._lengths.append(lengths)
+
+    def _remove(self, record_id):
+        doc = self._docs.pop(record_id, None)
+        if doc is None:
+            return False
+        for field, length in self._lengths[doc].items():
+            self._total_length[field] -= length
+        self._record_ids[doc] = None
+        self._fields[doc] = None
+        self._lengths[doc] = {}
+        self._dead.add(doc)
+        return True
+
+    def _changed(self):
+        self._results.clear()
+        if len(self._dead) > 1000 and len(self._dead) > COMPACT_RATIO * len(self._record_ids):
+            live = [{"id": record_id, "fields": fields}
+                    for record_id, fields in zip(self._record_ids, self._fields) if record_id is not None]
+            self._reset()
+            self.build(live)
+
+    # ── Queries ──
+
+    def search(self, query, fields=None, limit=20, offset=0):
+        """Ranked matches for a query string.
+
+        Every clause must match in at least one of the searched fields
+        (`fields`, or the clause's own field: restriction). Returns
+        (results, total, exact): each result has the record id, score,
+        matched fields and a snippet; exact is False when a phrase was only
+        checked against the best PHRASE_CHECK_LIMIT matches and the total
+        is extrapolated.
+        """
+        fields = tuple(field for field in (fields or SEARCH_FIELDS) if field in SEARCH_FIELDS)
+        clauses = parse_query(query)
+        if not clauses or not fields:
+            return [], 0, True
+
+        depth = max(offset + limit, 100)
+        key = (query, fields)
+        cached = self._results.get(key)
+        if cached is None or (cached[3] < depth and len(cached[0]) == cached[3]):
+            ranked, total, exact = self._rank(clauses, fields, depth)
+            cached = (ranked, total, exact, depth)
+            self._results[key] = cached
+            while len(self._results) > RESULT_CACHE_SIZE:
+                self._results.popitem(last=False)
+        else:
+            self._results.move_to_end(key)
+        ranked, total, exact, _ = cached
+
+        terms = {term for _, clause_terms, _, _ in clauses for term in clause_terms}
+        results = []
+        for doc, score in ranked[offset:offset + limit]:
+            matched = self._matched_fields(doc, clauses, fields)
+            results.append({
+                "id": self._record_ids[doc],
+                "score": round(score, 4),
+                "matched_fields": matched,
+                "snippet": self._snippet(doc, matched, terms),
+            })
+        return results, total, exact
+
+    def _rank(self, clauses, fields, depth):
+        """Top `depth` (doc, score) pairs, the number of matches and whether it is exact"""
+        scored = sorted((self._score_clause(clause, fields) for clause in clauses), key=len)
+        # Intersect from the rarest clause so the running set stays small
+        scores = scored[0]
+        for other in scored[1:]:
+            scores = {doc: scores[doc] + other[doc] for doc in scores.keys() & other.keys()}
+        for doc in self._dead & scores.keys():
+            del scores[doc]
+
+        phrases = [clause for clause in clauses if clause[3]]
+        if not phrases:
+            return heapq.nlargest(depth, scores.items(), key=itemgetter(1)), len(scores), True
+
+        # Phrase clauses were matched word by word; check word order on the
+        # best matches only, and extrapolate the total from them
+        ranked = []
+        checked = passed = 0
+        for doc, score in _by_score(scores, max(depth, PHRASE_CHECK_LIMIT)):
+            checked += 1
+            if all(self._has_phrase(doc, clause, fields) for clause in phrases):
+                passed += 1
+                if len(ranked) < depth:
+                    ranked.append((doc, score))
+            if len(ranked) >= depth and checked >= PHRASE_CHECK_LIMIT:
+                break
+        if checked == len(scores):
+            return ranked, passed, True
+        return ranked, round(len(scores) * passed / checked), False
+
+    def _score_clause(self, clause, fields):
+        """{doc: score} for one clause, summed over the searched fields and terms"""
+        field, terms, prefix, phrase = clause
+        live = len(self._docs) or 1
+        words = self._expand(terms[0]) if prefix else terms
+        by_word = {}
+
+        for name in ([field] if field else fields):
+            postings = self._postings[name]
+            for term in words:
+                entry = postings.get(term)
+                if entry is None:
+                    continue
+                docs, impacts = entry
+                df = len(docs)
+                weight = FIELD_WEIGHTS[name] * math.log(1 + (live - df + 0.5) / (df + 0.5))
+                values = map(weight.__mul__, impacts)
+                word_scores = by_word.get(term)
+                if word_scores is None:
+                    by_word[term] = dict(zip(docs, values))
+                else:
+                    for doc, value in zip(docs, values):
+                        word_scores[doc] = word_scores.get(doc, 0.0) + value
+
+        if not by_word:
+            return {}
+        if phrase:
+            # Every non-stopword of the phrase must occur in a searched field
+            if {term for term in terms if term not in STOPWORDS} - by_word.keys():
+                return {}
+            combined = sorted(by_word.values(), key=len)
+            scores = combined[0]
+            for other in combined[1:]:
+                scores = {doc: scores[doc] + other[doc] for doc in scores.keys() & other.keys()}
+            return scores
+
+        # A term or any of a prefix's expansions
+        combined = sorted(by_word.values(), key=len, reverse=True)
+        scores = combined[0]
+        for other in combined[1:]:
+            for doc, value in other.items():
+                scores[doc] = scores.get(doc, 0.0) + value
+        return scores
+
+    def _matched_fields(self, doc, clauses, fields):
+        matched = []
+        for name in fields:
+            postings = self._postings[name]
+            for field, terms, prefix, _ in clauses:
+                if field and field != name:
+                    continue
+                words = self._expand(terms[0]) if prefix else terms
+                if any(_has_doc(postings.get(term), doc) for term in words):
+                    matched.append(name)
+                    break
+        return matched
+
+    def _has_phrase(self, doc, clause, fields):
+        field, terms, _, _ = clause
+        pattern = _phrase_pattern(terms)
+        for name in ([field] if field else fields):
+            for column in SEARCH_FIELDS[name]:
+                value = self._fields[doc].get(column)
+                if isinstance(value, str) and pattern.search(value):
+                    return True
+        return False
+
+    def _expand(self, prefix):
+        """Vocabulary terms starting with prefix, most frequent first"""
+        if self._pending_terms:
+            if len(self._pending_terms) > 1000:
+                self._terms.extend(self._pending_terms)
+                self._terms.sort()
+            else:
+                for term in self._pending_terms:
+                    bisect.insort(self._terms, term)
+            self._pending_terms.clear()
+        start = bisect.bisect_left(self._terms, prefix)
+        end = bisect.bisect_left(self._terms, prefix + "\uffff")
+        candidates = self._terms[start:end]
+        if len(candidates) > MAX_EXPANSIONS:
+            frequency = {
+                term: sum(len(postings[term][0]) for postings in self._postings.values() if term in postings)
+                for term in candidates
+            }
+            candidates = sorted(candidates, key=lambda term: -frequency[term])[:MAX_EXPANSIONS]
+        return candidates
+
+    def _snippet(self, doc, fields, terms):
+        """A short excerpt around the first query term in the best matching field"""
+        pattern = re.compile(r"\b(" + "|".join(re.escape(term) for term in sorted(terms)) + ")", re.IGNORECASE)
+        for name in fields:
+            for column in SEARCH_FIELDS[name]:
+                value = self._fields[doc].get(column)
+                if not isinstance(value, str):
+                    continue
+                match = pattern.search(value)
+                if match is None:
+                    continue
+                start = max(0, match.start() - SNIPPET_RADIUS)
+                end = min(len(value), match.end() + SNIPPET_RADIUS)
+                text = " ".join(value[start:end].split())
+                return {
+                    "field": column,
+                    "text": ("…" if start else "") + text + ("…" if end < len(value) else ""),
+                }
+        return None
+
+
+def _analyse(fields):
+    """{search field: (token count, {term: frequency})} for an Airtable fields dict"""
+    analysis = {}
+    for field, columns in SEARCH_FIELDS.items():
+        tokens = []
+        for column in columns:
+            value = fields.get(column)
+            if value:
+                tokens.extend(tokenize(value))
+        counts = Counter(tokens)
+        for stopword in STOPWORDS.intersection(counts):
+            del counts[stopword]
+        analysis[field] = (len(tokens), counts)
+    return analysis
+
+
+def _by_score(scores, first):
+    """scores.items() best first; only sorts everything if more than `first` are consumed"""
+    head = heapq.nlargest(first, scores.items(), key=itemgetter(1))
+    yield from head
+    if len(head) < len(scores):
+        # nlargest(n) is sorted(...)[:n], so this continues the same order
+        yield from sorted(scores.items(), key=itemgetter(1), reverse=True)[len(head):]
+
+
+def _has_doc(entry, doc):
+    if entry is None:
+        return False
+    docs = entry[0]
+    # Document numbers are appended in increasing order
+    i = bisect.bisect_left(docs, doc)
+    return i < len(docs) and docs[i] == doc
+
+
+def _phrase_pattern(terms):
+    """Regex matching the phrase's words in order, separated only by non-word characters"""
+    return re.compile(r"\b" + r"[^a-z0-9]+".join(re.escape(term) for term in terms) + r"\b", re.IGNORECASE)
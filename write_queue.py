@@ -0,0 +1,122 @@
+"""
+Coalescing write queue for Airtable field updates
+Groups pending edits into Airtable's 10-records-per-request batch PATCH
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import requests
+
+
+logger = logging.getLogger(__name__)
+
+
+class CoalescingWriteQueue:
+    """Collects field updates per record and flushes them in batches.
+
+    Updates to the same record that arrive before it is flushed are merged
+    (later values win), so rapid comment autosaves cost one PATCH. Batches
+    are sent no faster than one per `min_interval` seconds; this only paces
+    one process, so flush_batch should go through a rate limiter shared by
+    every worker to stay under Airtable's per-base rate limit.
+
+    flush_batch(updates) receives a list of {"id", "fields"} dicts and must
+    return the updated Airtable records or raise. on_flushed(records), if
+    given, then applies them locally; it runs after the edits are committed,
+    so its failures are logged and never make the batch fail or resend.
+    """
+
+    def __init__(self, flush_batch, on_flushed=None, batch_size=10, window=0.2, min_interval=0.2):
+        self.flush_batch = flush_batch
+        self.on_flushed = on_flushed
+        self.batch_size = batch_size
+        self.window = window
+        self.min_interval = min_interval
+        self._pending = OrderedDict()  # record_id -> (fields, [futures])
+        self._cond = threading.Condition()
+        self._thread = None
+        self._last_flush = 0
+
+    def submit(self, record_id, fields):
+        """Queue an update; returns a Future resolving to the updated record"""
+        future = Future()
+        with self._cond:
+            if record_id in self._pending:
+                pending_fields, futures = self._pending[record_id]
+                pending_fields.update(fields)
+                futures.append(future)
+            else:
+                self._pending[record_id] = (dict(fields), [future])
+            self._ensure_thread()
+            self._cond.notify()
+        return future
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="airtable-writes", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+            # Give closely spaced edits a moment to land in the same batch
+            time.sleep(self.window)
+            wait = self.min_interval - (time.time() - self._last_flush)
+            if wait > 0:
+                time.sleep(wait)
+
+            with self._cond:
+                batch = []
+                while self._pending and len(batch) < self.batch_size:
+                    record_id, (fields, futures) = self._pending.popitem(last=False)
+                    batch.append((record_id, fields, futures))
+
+            self._last_flush = time.time()
+            self._flush(batch)
+
+    def _flush(self, batch):
+        try:
+            records = self.flush_batch([{"id": record_id, "fields": fields}
+                                        for record_id, fields, _ in batch])
+        except Exception as e:
+            if len(batch) == 1 or not _is_invalid_request(e):
+                # Timeouts and 5xx were already retried by the client; sending
+                # the records again one by one would only multiply the load
+                for _, _, futures in batch:
+                    for future in futures:
+                        future.set_exception(e)
+                return
+            # Airtable rejects the whole batch (422) if one record is bad, so
+            # retry one by one to pin the error on the record that caused it
+            for item in batch:
+                wait = self.min_interval - (time.time() - self._last_flush)
+                if wait > 0:
+                    time.sleep(wait)
+                self._last_flush = time.time()
+                self._flush([item])
+            return
+
+        if self.on_flushed is not None:
+            try:
+                self.on_flushed(records)
+            except Exception:
+                logger.exception("Applying %d written records locally failed", len(records))
+
+        by_id = {record["id"]: record for record in records}
+        for record_id, _, futures in batch:
+            for future in futures:
+                if record_id in by_id:
+                    future.set_result(by_id[record_id])
+                else:
+                    future.set_exception(KeyError(f"Airtable did not return {record_id}"))
+
+
+def _is_invalid_request(e):
+    """True for Airtable's 422, which rejects a whole batch over one bad record"""
+    return isinstance(e, requests.HTTPError) and e.response is not None and e.response.status_code == 422